@@ -5,3 +5,16 @@ import pysvd.node
 import pysvd.parser
 import pysvd.classes
 import pysvd.element
+import pysvd.dump
+import pysvd.simulator
+import pysvd.compare
+import pysvd.canonical
+import pysvd.index
+import pysvd.manifest
+import pysvd.interrupts
+import pysvd.layout
+import pysvd.template
+import pysvd.output
+import pysvd.batch
+
+from pysvd.compare import diff
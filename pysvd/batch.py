@@ -0,0 +1,116 @@
+"""Batch processing of many SVD files.
+
+Console scripts accept several SVD files or directories together with an output file template like 'doc/{name}.rst'. Files are
+converted in a process pool, each worker imports pysvd once and converts many files. Errors of a file are reported in its result and do
+not abort the batch.
+"""
+import argparse
+import collections
+import concurrent.futures
+import importlib
+import os
+import sys
+import traceback
+
+Result = collections.namedtuple('Result', ['filename', 'output', 'value', 'error'])
+Result.__doc__ = """Result of converting filename to output: return value of the conversion or error text"""
+
+
+def inputs(paths, extension='.svd'):
+    """Get list of files, directories are searched recursively for files with extension"""
+    result = []
+    for path in paths:
+        if os.path.isdir(path):
+            found = []
+            for (root, dirs, files) in os.walk(path):
+                found += [os.path.join(root, name) for name in files if name.lower().endswith(extension)]
+            result += sorted(found)
+        else:
+            result.append(path)
+    return result
+
+
+def output_name(template, filename):
+    """Get output file of filename from template with fields {name} (file name without extension) and {directory}"""
+    return template.format(name=os.path.splitext(os.path.basename(filename))[0], directory=os.path.dirname(filename))
+
+
+def call(function, filename, output, *arguments):
+    """Call function(filename, output, *arguments) and return its Result, exceptions are caught. The directory of output is created."""
+    try:
+        directory = os.path.dirname(output or '')
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return Result(filename, output, function(filename, output, *arguments), None)
+    except Exception:
+        return Result(filename, output, None, traceback.format_exc())
+
+
+def run(function, filenames, template, arguments=(), jobs=None, initializer=None, initargs=()):
+    """Convert each file with function(filename, output, *arguments) in a process pool of jobs processes (serial if jobs is 1), workers
+    are set up once by initializer(*initargs). Output is None without template. Returns iterator over results in order of filenames."""
+    outputs = [output_name(template, filename) if template is not None else None for filename in filenames]
+    parameters = ([function] * len(filenames), filenames, outputs) + tuple([argument] * len(filenames) for argument in arguments)
+    if jobs == 1:
+        yield from map(call, *parameters)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(jobs, initializer=initializer, initargs=initargs) as executor:
+        yield from executor.map(call, *parameters)
+
+
+def report(results, file):
+    """Write errors of results to file. Returns number of failed files."""
+    failed = 0
+    for result in results:
+        if result.error is not None:
+            file.write("Error converting '{}':\n{}\n".format(result.filename, result.error))
+            failed += 1
+    return failed
+
+
+def load_templates(module, directory):
+    """Override templates (attribute templates) of generator module by files of directory, if not None. Used as initializer of workers."""
+    if directory is not None:
+        importlib.import_module(module).templates.load(directory)
+
+
+def files(parser, args):
+    """Get SVD files of args.svd, exits with usage error if none are found or output templates (args.output, args.manifest) lack {name}
+    for several files"""
+    filenames = inputs(args.svd)
+    if not filenames:
+        parser.error('no SVD files found')
+    if len(filenames) > 1:
+        for option in ('output', 'manifest'):
+            if getattr(args, option, None) and '{name}' not in getattr(args, option):
+                parser.error('--{} needs {{name}} for multiple SVD files'.format(option))
+    return filenames
+
+
+def finish(parser, results, count, output=None):
+    """Report errors of results in order on stderr and write their values to output (if not None). Exits with status 1 on failed files."""
+    failed = 0
+    for result in results:
+        if result.error is not None:
+            failed += report([result], sys.stderr)
+        elif output is not None:
+            output.write(result.value)
+    if output is not None:
+        output.flush()
+    if failed:
+        parser.exit(1, '{} of {} files failed\n'.format(failed, count))
+
+
+def main(parser, args, convert, module):
+    """Convert args.svd files by convert(filename, output, args) into args.output (template with {name} for several files) with templates
+    of module loaded from args.templates. Several files are converted in a pool of args.jobs processes, each file serially."""
+    load_templates(module, args.templates)
+    filenames = files(parser, args)
+    if len(filenames) == 1:
+        convert(filenames[0], output_name(args.output, filenames[0]), args)
+        return
+
+    results = run(convert, filenames, args.output, (argparse.Namespace(**dict(vars(args), jobs=1)), ), args.jobs, load_templates,
+                  (module, args.templates))
+    finish(parser, results, len(filenames))
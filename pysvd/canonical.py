@@ -0,0 +1,76 @@
+"""Canonical form of SVD XML trees.
+
+Descriptions are normalized to single spaced text and containers are sorted: peripherals by natural name order, registers and clusters
+by addressOffset, fields by bit offset and enumeratedValue entries by value (defaults last). Everything is done in one traversal with
+sort keys computed once per element.
+"""
+import re
+
+import pysvd
+
+
+def natural(text):
+    """Get natural sort key of text, e.g. 'TIMER2' < 'TIMER10'"""
+    parts = re.split(r'([0-9]+)', text or '')
+    parts[1::2] = [int(part) for part in parts[1::2]]
+    return parts
+
+
+def integer(node, name, default=-1):
+    """Get integer value of child element, don't care bits 'x' are replaced by 0"""
+    return pysvd.parser.Integer(node.findtext(name), default)
+
+
+def key_peripheral(node):
+    """Sort peripherals by name"""
+    return natural(node.findtext('name'))
+
+
+def key_register(node):
+    """Sort registers and clusters by addressOffset"""
+    return integer(node, 'addressOffset')
+
+
+def key_field(node):
+    """Sort fields by bitOffset, lsb or bitRange"""
+    bitOffset = integer(node, 'bitOffset', None)
+    if bitOffset is None:
+        bitOffset = integer(node, 'lsb', None)
+    if bitOffset is None:
+        match = re.search(r':([0-9]+)\]', node.findtext('bitRange', ''))
+        bitOffset = int(match.group(1)) if match else -1
+    return bitOffset
+
+
+def key_enumerated_value(node):
+    """Sort enumeratedValue entries by value. Other elements (name, usage, ...) first, entries without value (isDefault) last"""
+    if node.tag != 'enumeratedValue':
+        return (0, -1)
+    value = integer(node, 'value', None)
+    return (1, value) if value is not None else (2, 0)
+
+
+keys = {
+    'peripherals': key_peripheral,
+    'registers': key_register,
+    'fields': key_field,
+    'enumeratedValues': key_enumerated_value,
+}
+
+
+def canonicalize(root, sort=True):
+    """Normalize descriptions and, if sort is set, sort all containers of the tree in place. Returns root."""
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.tag == 'description':
+            if node.text is not None:
+                node.text = ' '.join(node.text.split())
+            continue
+
+        key = keys.get(node.tag) if sort else None
+        if key is not None:
+            # Decorate-sort-undecorate, index keeps sort stable without comparing elements
+            node[:] = [child for (_, _, child) in sorted((key(child), index, child) for (index, child) in enumerate(node))]
+        stack.extend(node)
+    return root
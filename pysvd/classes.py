@@ -1,4 +1,5 @@
 import re
+import hashlib
 import pysvd
 
 # Note construtors: First class specific code is executed than parent constructor
@@ -45,6 +46,71 @@ class Base(object):
             elements.append(cls(parent, subnode))
 
 
+class Digest(object):
+    """Mixin for elements with cached content digests. The struct digest is build from the digests of the child elements returned by
+    digest_children(), the full digest additionally from the attributes listed in digest_attributes. Equality is decided by comparing
+    digests.
+
+    Note: Digests are computed on first use, changes of the element afterwards are not reflected.
+    """
+
+    digest_attributes = []
+
+    def digest_children(self):
+        """Overwrite in derived classes to return child elements"""
+        return []
+
+    def digest_struct(self):
+        """Digest of child elements only"""
+        digest = self.__dict__.get('_digest_struct')
+        if digest is None:
+            hasher = hashlib.blake2b(digest_size=16)
+            hasher.update(self.__class__.__name__.encode())
+            for child in self.digest_children():
+                hasher.update(child.digest().encode() if child is not None else b'-')
+            digest = hasher.hexdigest()
+            self.__dict__['_digest_struct'] = digest
+        return digest
+
+    def digest(self):
+        """Digest of child elements and attributes"""
+        digest = self.__dict__.get('_digest')
+        if digest is None:
+            hasher = hashlib.blake2b(digest_size=16)
+            hasher.update(self.digest_struct().encode())
+            for name in self.digest_attributes:
+                try:
+                    value = getattr(self, name)
+                except AttributeError:
+                    hasher.update('\x1e{}!'.format(name).encode())
+                    continue
+                if isinstance(value, Digest):
+                    value = value.digest()
+                hasher.update('\x1e{}={!r}'.format(name, value).encode())
+            digest = hasher.hexdigest()
+            self.__dict__['_digest'] = digest
+        return digest
+
+    def __eq__(self, other):
+        """Compare element and all attributes."""
+        if not isinstance(other, self.__class__):
+            return NotImplemented
+        return self.digest() == other.digest()
+
+    def __hash__(self):
+        return hash(self.digest())
+
+    def equal_struct(self, other):
+        """Compare only child elements."""
+        if not isinstance(other, self.__class__):
+            return NotImplemented
+        return self.digest_struct() == other.digest_struct()
+
+    def hash_struct(self):
+        """Hash only child elements, consistent with equal_struct()."""
+        return hash(self.digest_struct())
+
+
 class Parent(Base):
     """Base class for parents"""
 
@@ -66,10 +132,11 @@ class Group(Parent):
         if attr in self.attributes:
             parent = self.parent
             while parent is not None:
-                try:
-                    return parent.__getattribute__(attr)
-                except AttributeError:
-                    parent = parent.parent
+                # Look up __dict__ directly instead of raising AttributeError per level
+                values = parent.__dict__
+                if attr in values:
+                    return values[attr]
+                parent = values.get('parent')
 
         raise AttributeError("'{}' object has no attribute '{}'".format(self.__class__.__name__, attr))
 
@@ -149,15 +216,9 @@ class Dim(Derive):
                 dimIncrement = pysvd.parser.Integer(pysvd.node.Element(subnode, 'dimIncrement', True))
                 dimIndex = pysvd.parser.Text(pysvd.node.Element(subnode, 'dimIndex'))
 
-                # if dimIndex is not present, dimName and name has to be examined for '[%s]' string presence,
-                # to distinguish between array and index
+                # if dimIndex is not present, arrays ('[%s]') and lists ('%s') are indexed starting with 0
                 if dimIndex is None:
-                    dimName = pysvd.parser.Text(pysvd.node.Element(subnode, 'dimName'))
-                    name = pysvd.parser.Text(pysvd.node.Element(subnode, 'name'))
-                    if dimName is not None and '[%s]' in dimName or name is not None and '[%s]' in name:
-                        dimIndices = range(dim)
-                    else:
-                        dimIndices = [dim]
+                    dimIndices = range(dim)
                 else:
                     if ',' in dimIndex:
                         dimIndices = dimIndex.split(',')
@@ -0,0 +1,142 @@
+"""Structural diff between two device versions.
+
+Peripherals, clusters, registers, fields and enumerated values are aligned by name, unmatched elements by address. Subtrees with equal
+digests are skipped without descending into them.
+"""
+import collections
+from enum import Enum
+
+import pysvd
+
+
+class Kind(Enum):
+    """Kind of change"""
+
+    added = 'added'
+    removed = 'removed'
+    renamed = 'renamed'
+    moved = 'moved'
+    changed = 'changed'
+
+    def __str__(self):
+        return self.value
+
+
+class Change(collections.namedtuple('Change', ['kind', 'path', 'attribute', 'old', 'new'])):
+    """Change of an element (attribute is None) or of an attribute of the element at path"""
+
+    __slots__ = ()
+
+    def __str__(self):
+        if self.kind in (Kind.added, Kind.removed):
+            return "{} {}".format(self.kind, self.path)
+        if self.attribute is None:
+            return "{} {}: {} -> {}".format(self.kind, self.path, self.old, self.new)
+        return "{} {}.{}: {} -> {}".format(self.kind, self.path, self.attribute, self.old, self.new)
+
+
+# Attribute giving the location of an element in its parent, changes of it are reported as moved (except for enumeratedValue)
+location = {
+    pysvd.element.Peripheral: 'baseAddress',
+    pysvd.element.Cluster: 'addressOffset',
+    pysvd.element.Register: 'addressOffset',
+    pysvd.element.Field: 'bitOffset',
+    pysvd.element.EnumeratedValue: 'value',
+}
+
+
+def children(element):
+    """Get child elements to align"""
+    if isinstance(element, pysvd.element.Field):
+        return element.enumeratedValues.enumeratedValues if hasattr(element, 'enumeratedValues') else []
+    return element.digest_children()
+
+
+def key(element):
+    """Get name to align elements by"""
+    name = getattr(element, 'name', None)
+    if name is None:
+        # Unnamed enumeratedValue
+        return '#{}'.format(getattr(element, 'value', 'default'))
+    return name
+
+
+def diff_attributes(path, old, new):
+    """Generator of changed attributes of two aligned elements"""
+    attribute = location.get(type(old))
+    for name in old.digest_attributes:
+        if name == 'name':
+            continue
+
+        lhs = getattr(old, name, None)
+        rhs = getattr(new, name, None)
+        if isinstance(lhs, pysvd.classes.Digest) and isinstance(rhs, pysvd.classes.Digest):
+            if lhs.digest() == rhs.digest():
+                continue
+            lhs = {name: getattr(lhs, name, None) for name in lhs.digest_attributes}
+            rhs = {name: getattr(rhs, name, None) for name in rhs.digest_attributes}
+
+        if lhs != rhs:
+            moved = name == attribute and not isinstance(old, pysvd.element.EnumeratedValue)
+            yield Change(Kind.moved if moved else Kind.changed, path, name, lhs, rhs)
+
+    if isinstance(old, pysvd.element.Field):
+        lhs = getattr(old, 'enumeratedValues', None)
+        rhs = getattr(new, 'enumeratedValues', None)
+        if lhs is not None and rhs is not None:
+            for name in lhs.digest_attributes:
+                if getattr(lhs, name, None) != getattr(rhs, name, None):
+                    yield Change(Kind.changed, path, 'enumeratedValues.' + name, getattr(lhs, name, None), getattr(rhs, name, None))
+
+
+def diff_elements(prefix, old, new):
+    """Generator of changes between two lists of elements"""
+    new_index = {}
+    for element in new:
+        new_index.setdefault(key(element), element)
+
+    matched = set()
+    removed = []
+    for element in old:
+        name = key(element)
+        other = new_index.get(name)
+        if other is None or name in matched:
+            removed.append(element)
+            continue
+        matched.add(name)
+        yield from diff_element(prefix + name, element, other)
+
+    added = [element for element in new if key(element) not in matched]
+
+    # Align remaining elements by location to detect renames
+    added_index = {}
+    for element in added:
+        added_index.setdefault((type(element), getattr(element, location.get(type(element), ''), None)), []).append(element)
+
+    for element in removed:
+        candidates = added_index.get((type(element), getattr(element, location.get(type(element), ''), None)))
+        if candidates and location.get(type(element)) is not None:
+            other = candidates.pop(0)
+            added.remove(other)
+            yield Change(Kind.renamed, prefix + key(element), None, key(element), key(other))
+            yield from diff_element(prefix + key(other), element, other)
+        else:
+            yield Change(Kind.removed, prefix + key(element), None, element, None)
+
+    for element in added:
+        yield Change(Kind.added, prefix + key(element), None, None, element)
+
+
+def diff_element(path, old, new):
+    """Generator of changes between two aligned elements"""
+    if old.digest() == new.digest():
+        return
+
+    yield from diff_attributes(path, old, new)
+    if old.digest_struct() != new.digest_struct():
+        yield from diff_elements(path + '.', children(old), children(new))
+
+
+def diff(old, new):
+    """Generator of changes between two devices"""
+    yield from diff_elements('', old.peripherals, new.peripherals)
@@ -0,0 +1,75 @@
+"""Decode raw memory dumps against the device address map.
+
+The dump file is memory mapped, so only the pages holding registers are read by the operating system.
+"""
+import bisect
+import csv
+import mmap
+
+import pysvd
+
+
+def byteorder(device):
+    """Get byte order of the device for int.from_bytes()"""
+    cpu = getattr(device, 'cpu', None)
+    if cpu is not None and cpu.endian == pysvd.type.endian.big:
+        return 'big'
+    return 'little'
+
+
+class Dump(object):
+    """Memory mapped dump file starting at baseAddress"""
+
+    def __init__(self, device, filename, baseAddress):
+        self.device = device
+        self.baseAddress = baseAddress
+        self.byteorder = byteorder(device)
+
+        self.file = open(filename, 'rb')
+        self.mmap = None
+        self.view = memoryview(b'')
+        try:
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.view = memoryview(self.mmap)
+        except ValueError:
+            # Empty file can not be mapped
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.view.release()
+        if self.mmap is not None:
+            self.mmap.close()
+        self.file.close()
+
+    def registers(self):
+        """Generator of (path, value, fields) for every register completely inside the dump."""
+        address_map = self.device.address_map()
+        end = self.baseAddress + len(self.view)
+        view = self.view
+        order = self.byteorder
+
+        index = bisect.bisect_left(address_map, (self.baseAddress, ))
+        for (address, path, register) in address_map[index:]:
+            if address >= end:
+                break
+
+            offset = address - self.baseAddress
+            size = register.size // 8
+            if offset + size > len(view):
+                continue
+
+            value = int.from_bytes(view[offset:offset + size], order)
+            yield (path, value, register.decode(value))
+
+    def write(self, output):
+        """Write decoded registers columnar as CSV to the output file object."""
+        writer = csv.writer(output)
+        writer.writerow(('path', 'value', 'fields'))
+        for (path, value, fields) in self.registers():
+            writer.writerow((path, '0x{:X}'.format(value), ' '.join('{}={}'.format(name, field) for (name, field) in fields.items())))
@@ -4,16 +4,16 @@ import re
 import pysvd
 
 
-def compare_attribute(lhs, rhs, attibute):
-    """Compare attibute of objects.
-    """
-    if hasattr(lhs, attibute) != hasattr(rhs, attibute):
-        return False
-
-    if hasattr(lhs, attibute):
-        return getattr(lhs, attibute) == getattr(rhs, attibute)
+# Field value written in a read-modify-write cycle that does not trigger the write side effect (-1 for all bits set)
+write_neutral = {
+    pysvd.type.modifiedWriteValues.oneToClear: 0,
+    pysvd.type.modifiedWriteValues.oneToSet: 0,
+    pysvd.type.modifiedWriteValues.oneToToggle: 0,
+    pysvd.type.modifiedWriteValues.zeroToClear: -1,
+    pysvd.type.modifiedWriteValues.zeroToSet: -1,
+    pysvd.type.modifiedWriteValues.zeroToToggle: -1,
+}
 
-    return True
 
 # /device
 # http://www.keil.com/pack/doc/cmsis/svd/html/elem_device.html
@@ -83,6 +83,37 @@ class Device(pysvd.classes.Base):
                 return peripheral
         return None
 
+    def address_map(self):
+        """Sorted list of (address, path, register) tuples of all registers in the device. The list is build once and cached."""
+        address_map = self.__dict__.get('_address_map')
+        if address_map is None:
+            address_map = []
+            stack = [(peripheral.baseAddress, peripheral.name, peripheral) for peripheral in self.peripherals]
+            while stack:
+                (address, path, parent) = stack.pop()
+                for register in parent.registers:
+                    address_map.append((address + register.addressOffset, '{}.{}'.format(path, register.name), register))
+                for cluster in parent.clusters:
+                    stack.append((address + cluster.addressOffset, '{}.{}'.format(path, cluster.name), cluster))
+
+            address_map.sort(key=lambda item: (item[0], item[1]))
+            self.__dict__['_address_map'] = address_map
+        return address_map
+
+    @property
+    def interrupts(self):
+        """Index of the interrupts of all peripherals (see pysvd.interrupts). The index is build once and cached."""
+        interrupts = self.__dict__.get('_interrupts')
+        if interrupts is None:
+            interrupts = pysvd.interrupts.InterruptIndex(self)
+            self.__dict__['_interrupts'] = interrupts
+        return interrupts
+
+    def reset_image(self):
+        """Build NumPy reset image over each address block (see pysvd.image)."""
+        import pysvd.image
+        return pysvd.image.ResetImage(self)
+
 
 # /device/cpu
 # http://www.keil.com/pack/doc/cmsis/svd/html/elem_cpu.html
@@ -180,7 +211,7 @@ class SauRegionsConfigRegion(pysvd.classes.Parent):
 
 # /device/peripherals/peripheral
 # http://www.keil.com/pack/doc/cmsis/svd/html/elem_peripherals.html#elem_peripheral
-class Peripheral(pysvd.classes.Dim):
+class Peripheral(pysvd.classes.Dim, pysvd.classes.Digest):
     """At least one peripheral has to be defined.
 
     * Each peripheral describes all registers belonging to that peripheral.
@@ -194,6 +225,9 @@ class Peripheral(pysvd.classes.Dim):
     peripheral using different names, you must use the derivedFrom attribute.
     """
 
+    digest_attributes = ['name', 'description', 'version', 'alternatePeripheral', 'groupName', 'prependToName', 'appendToName',
+                         'headerStructName', 'disableCondition', 'baseAddress', 'addressBlock', 'interrupt']
+
     def __init__(self, parent, node):
         self.addressBlocks = []
         self.registers = []
@@ -201,48 +235,8 @@ class Peripheral(pysvd.classes.Dim):
 
         super().__init__(parent, node)
 
-    def __eq__(self, other):
-        """Compare element and all attributes.
-        """
-        if not isinstance(other, Peripheral):
-            return NotImplemented
-
-        if not self.equal_struct(other):
-            return False
-
-        return compare_attribute(self, other, 'name') and \
-            compare_attribute(self, other, 'description') and \
-            compare_attribute(self, other, 'version') and \
-            compare_attribute(self, other, 'alternatePeripheral') and \
-            compare_attribute(self, other, 'groupName') and \
-            compare_attribute(self, other, 'prependToName') and \
-            compare_attribute(self, other, 'appendToName') and \
-            compare_attribute(self, other, 'headerStructName') and \
-            compare_attribute(self, other, 'disableCondition') and \
-            compare_attribute(self, other, 'baseAddress') and \
-            compare_attribute(self, other, 'addressBlock') and \
-            compare_attribute(self, other, 'interrupt')
-
-    def equal_struct(self, other):
-        """Compare only child elements.
-        """
-        if not isinstance(other, Peripheral):
-            return NotImplemented
-
-        if len(self.registers) != len(other.registers):
-            return False
-
-        for (lhs, rhs) in zip(self.registers, other.registers):
-            if lhs != rhs:
-                return False
-
-        if len(self.clusters) != len(other.clusters):
-            return False
-
-        for (lhs, rhs) in zip(self.clusters, other.clusters):
-            if lhs != rhs:
-                return False
-        return True
+    def digest_children(self):
+        return self.registers + self.clusters
 
     def set_offset(self, value):
         self.baseAddress += value
@@ -332,7 +326,7 @@ class Interrupt(pysvd.classes.Parent):
 
 # /device/pripherals/peripheral/registers/.../cluster
 # http://www.keil.com/pack/doc/cmsis/svd/html/elem_registers.html#elem_cluster
-class Cluster(pysvd.classes.Dim):
+class Cluster(pysvd.classes.Dim, pysvd.classes.Digest):
     """Cluster describes a sequence of neighboring registers within a peripheral. A <cluster> specifies the addressOffset relative to the
     baseAddress of the grouping element. All <register> elements within a <cluster> specify their addressOffset relative to the cluster
     base address (<peripheral.baseAddress> + <cluster.addressOffset>).
@@ -343,12 +337,18 @@ class Cluster(pysvd.classes.Dim):
     also specify an array of a cluster using the <dim> element.
     """
 
+    digest_attributes = ['name', 'description', 'alternateCluster', 'headerStructName', 'addressOffset', 'size', 'access', 'protection',
+                         'resetValue', 'resetMask']
+
     def __init__(self, parent, node):
         self.registers = []
         self.clusters = []
 
         super().__init__(parent, node)
 
+    def digest_children(self):
+        return self.registers + self.clusters
+
     def set_offset(self, value):
         self.addressOffset += value
 
@@ -384,7 +384,7 @@ class Cluster(pysvd.classes.Dim):
 
 # /device/peripherals/peripheral/registers/.../register
 # http://www.keil.com/pack/doc/cmsis/svd/html/elem_registers.html#elem_register
-class Register(pysvd.classes.Dim):
+class Register(pysvd.classes.Dim, pysvd.classes.Digest):
     """The description of registers is the most essential part of SVD. If the elements <size>, <access>, <resetValue>, and <resetMask>
     have not been specified on a higher level, then these elements are mandatory on register level.
 
@@ -397,48 +397,16 @@ class Register(pysvd.classes.Dim):
     <dimIncrement> specifies the address offset between two registers.
     """
 
+    digest_attributes = ['name', 'displayName', 'description', 'alternateGroup', 'alternateRegister', 'addressOffset', 'size', 'access',
+                         'protection', 'resetValue', 'resetMask', 'dataType', 'modifiedWriteValues', 'readAction']
+
     def __init__(self, parent, node):
         self.fields = []
 
         super().__init__(parent, node)
 
-    def __eq__(self, other):
-        """Compare element and all attributes.
-        """
-        if not isinstance(other, Register):
-            return NotImplemented
-
-        if not self.equal_struct(other):
-            return False
-
-        return compare_attribute(self, other, 'name') and \
-            compare_attribute(self, other, 'displayName') and \
-            compare_attribute(self, other, 'description') and \
-            compare_attribute(self, other, 'alternateGroup') and \
-            compare_attribute(self, other, 'alternateRegister') and \
-            compare_attribute(self, other, 'addressOffset') and \
-            compare_attribute(self, other, 'size') and \
-            compare_attribute(self, other, 'access') and \
-            compare_attribute(self, other, 'protection') and \
-            compare_attribute(self, other, 'resetValue') and \
-            compare_attribute(self, other, 'resetMask') and \
-            compare_attribute(self, other, 'dataType') and \
-            compare_attribute(self, other, 'modifiedWriteValues') and \
-            compare_attribute(self, other, 'readAction')
-
-    def equal_struct(self, other):
-        """Compare only child elements.
-        """
-        if not isinstance(other, Register):
-            return NotImplemented
-
-        if len(self.fields) != len(other.fields):
-            return False
-
-        for (lhs, rhs) in zip(self.fields, other.fields):
-            if lhs != rhs:
-                return False
-        return True
+    def digest_children(self):
+        return self.fields
 
     def set_offset(self, value):
         self.addressOffset += value
@@ -481,13 +449,117 @@ class Register(pysvd.classes.Dim):
                 return field
         return None
 
+    def compile(self):
+        """Precompile write base value, field masks and write constraints used by encode().
+
+        The base value is the reset value, where fields with write side effects (e.g. oneToClear) are set to the value which does not
+        trigger the side effect.
+        """
+        base = getattr(self, 'resetValue', 0) & getattr(self, 'resetMask', 0xFFFFFFFF) & ((1 << getattr(self, 'size', 32)) - 1)
+        fields = {}
+        for field in self.fields:
+            mask = (1 << field.bitWidth) - 1
+
+            modifiedWriteValues = field.modifiedWriteValues
+            if modifiedWriteValues == pysvd.type.modifiedWriteValues.modify:
+                modifiedWriteValues = self.modifiedWriteValues
+            neutral = write_neutral.get(modifiedWriteValues)
+            if neutral is not None:
+                base = (base & ~(mask << field.bitOffset)) | ((neutral & mask) << field.bitOffset)
+
+            names = {}
+            enumeratedValues = None
+            if hasattr(field, 'enumeratedValues') and field.enumeratedValues.usage != pysvd.type.enumUsage.read:
+                for enumeratedValue in field.enumeratedValues.enumeratedValues:
+                    if hasattr(enumeratedValue, 'name') and hasattr(enumeratedValue, 'value'):
+                        names[enumeratedValue.name] = enumeratedValue.value
+                enumeratedValues = field.enumeratedValues
+
+            valueRange = None
+            if hasattr(field, 'writeConstraint'):
+                writeConstraint = field.writeConstraint
+                if hasattr(writeConstraint, 'rangeMinimum'):
+                    valueRange = (writeConstraint.rangeMinimum, writeConstraint.rangeMaximum)
+                if not getattr(writeConstraint, 'useEnumeratedValues', False):
+                    enumeratedValues = None
+            else:
+                enumeratedValues = None
+
+            readOnly = getattr(field, 'access', None) == pysvd.type.access.read_only
+            fields[field.name] = (field.bitOffset, mask, readOnly, names, valueRange, enumeratedValues)
+
+        valueRange = None
+        if hasattr(self, 'writeConstraint') and hasattr(self.writeConstraint, 'rangeMinimum'):
+            valueRange = (self.writeConstraint.rangeMinimum, self.writeConstraint.rangeMaximum)
+
+        encoder = (base, fields, valueRange)
+        self.__dict__['_encoder'] = encoder
+        return encoder
+
+    def decode(self, value):
+        """Split register value into a dict of field values."""
+        decoder = self.__dict__.get('_decoder')
+        if decoder is None:
+            decoder = tuple((field.name, field.bitOffset, (1 << field.bitWidth) - 1) for field in self.fields)
+            self.__dict__['_decoder'] = decoder
+        return {name: (value >> bitOffset) & mask for (name, bitOffset, mask) in decoder}
+
+    def encode(self, **fields):
+        """Build register value from field values (integer or enumeratedValue name). Fields not given keep their reset value or the
+        value not triggering a write side effect.
+        """
+        return self.encode_batch((fields, ))[0]
+
+    def encode_batch(self, rows):
+        """Build register values from an iterable of field value dicts."""
+        encoder = self.__dict__.get('_encoder')
+        if encoder is None:
+            encoder = self.compile()
+        (base, fields, registerRange) = encoder
+
+        result = []
+        for row in rows:
+            value = base
+            for (name, fieldValue) in row.items():
+                try:
+                    (bitOffset, mask, readOnly, names, valueRange, enumeratedValues) = fields[name]
+                except KeyError:
+                    raise KeyError("Register '{}' has no field '{}'".format(self.name, name))
+
+                if readOnly:
+                    raise ValueError("Field '{}.{}' is read-only".format(self.name, name))
+
+                if isinstance(fieldValue, str):
+                    try:
+                        fieldValue = names[fieldValue]
+                    except KeyError:
+                        raise ValueError("Field '{}.{}' has no enumeratedValue '{}'".format(self.name, name, fieldValue))
+
+                if fieldValue < 0 or fieldValue > mask:
+                    raise ValueError("Value {} does not fit into field '{}.{}'".format(fieldValue, self.name, name))
+                if valueRange is not None and not valueRange[0] <= fieldValue <= valueRange[1]:
+                    raise ValueError("Value {} of field '{}.{}' is out of range [{}, {}]".format(
+                        fieldValue, self.name, name, valueRange[0], valueRange[1]))
+                if enumeratedValues is not None and enumeratedValues.match(fieldValue) is None:
+                    raise ValueError("Value {} of field '{}.{}' is no enumeratedValue".format(fieldValue, self.name, name))
+
+                value = (value & ~(mask << bitOffset)) | (fieldValue << bitOffset)
+
+            if registerRange is not None and not registerRange[0] <= value <= registerRange[1]:
+                raise ValueError("Value {} of register '{}' is out of range [{}, {}]".format(value, self.name, registerRange[0],
+                                                                                             registerRange[1]))
+            result.append(value)
+        return result
+
 
 # /device/peripherals/peripheral/registers/.../register/.../writeConstraint
 # http://www.keil.com/pack/doc/cmsis/svd/html/elem_registers.html#elem_writeConstraint
-class WriteConstraint(pysvd.classes.Parent):
+class WriteConstraint(pysvd.classes.Parent, pysvd.classes.Digest):
     """Define constraints for writing values to a field. You can choose between three options, which are mutualy exclusive.
     """
 
+    digest_attributes = ['writeAsRead', 'useEnumeratedValues', 'rangeMinimum', 'rangeMaximum']
+
     def __init__(self, parent, node):
         super().__init__(parent, node)
 
@@ -524,7 +596,7 @@ class WriteConstraint(pysvd.classes.Parent):
 
 # /device/peripherals/peripheral/registers/.../fields/field
 # http://www.keil.com/pack/doc/cmsis/svd/html/elem_registers.html#elem_field
-class Field(pysvd.classes.Dim):
+class Field(pysvd.classes.Dim, pysvd.classes.Digest):
     """All fields of a register are enclosed between the <fields> opening and closing tags.
 
     A bit-field has a name that is unique within the register. The position and size within the register can be decsribed in two ways:
@@ -535,44 +607,13 @@ class Field(pysvd.classes.Dim):
     """
 
     attributes = ['access']
+    digest_attributes = ['name', 'description', 'bitOffset', 'bitWidth', 'access', 'modifiedWriteValues', 'readAction', 'writeConstraint']
 
     def __init__(self, parent, node):
         super().__init__(parent, node)
 
-    def __eq__(self, other):
-        if not isinstance(other, Field):
-            return NotImplemented
-
-        if not self.equal_struct(other):
-            return False
-
-        return compare_attribute(self, other, 'name') and \
-            compare_attribute(self, other, 'description') and \
-            compare_attribute(self, other, 'bitOffset') and \
-            compare_attribute(self, other, 'bitWidth') and \
-            compare_attribute(self, other, 'access') and \
-            compare_attribute(self, other, 'modifiedWriteValues') and \
-            compare_attribute(self, other, 'readAction') and \
-            compare_attribute(self, other, 'writeConstraint')
-
-    def equal_struct(self, other):
-        """Check structure elements, but not overridable attributes.
-        """
-        if not isinstance(other, Field):
-            return NotImplemented
-
-        return compare_attribute(self, other, 'enumeratedValues')
-
-        x = """
-        if len(self.enumeratedValues) != len(other.enumeratedValues):
-            return False
-
-        for (lhs, rhs) in zip(self.enumeratedValues, other.enumeratedValues):
-            if lhs != rhs:
-                return False
-        return True
-        """
-
+    def digest_children(self):
+        return [self.enumeratedValues] if hasattr(self, 'enumeratedValues') else []
 
     def set_offset(self, value):
         self.bitOffset += value
@@ -628,7 +669,7 @@ class Field(pysvd.classes.Dim):
 
 # /device/peripherals/peripheral/registers/.../field/enumeratedValues
 # http://www.keil.com/pack/doc/cmsis/svd/html/elem_registers.html#elem_enumeratedValues
-class EnumeratedValues(pysvd.classes.Derive):
+class EnumeratedValues(pysvd.classes.Derive, pysvd.classes.Digest):
     """The concept of enumerated values creates a map between unsigned integers and an identifier string. In addition, a description string
     can be associated with each entry in the map.
 
@@ -642,33 +683,15 @@ class EnumeratedValues(pysvd.classes.Derive):
     instructive. The detailed description can provide reference manual level details within the debugger.
     """
 
+    digest_attributes = ['name', 'headerEnumName', 'usage']
+
     def __init__(self, parent, node):
         self.enumeratedValues = []
 
         super().__init__(parent, node)
 
-    def __eq__(self, other):
-        if not isinstance(other, EnumeratedValues):
-            return NotImplemented
-
-        if not self.equal_struct(other):
-            return False
-
-        return compare_attribute(self, other, 'name') and \
-            compare_attribute(self, other, 'headerEnumName') and \
-            compare_attribute(self, other, 'usage')
-
-    def equal_struct(self, other):
-        if not isinstance(other, EnumeratedValues):
-            return NotImplemented
-
-        if len(self.enumeratedValues) != len(other.enumeratedValues):
-            return False
-
-        for (lhs, rhs) in zip(self.enumeratedValues, other.enumeratedValues):
-            if lhs != rhs:
-                return False
-        return True
+    def digest_children(self):
+        return self.enumeratedValues
 
     def parse(self, node):
         super().parse(node)
@@ -684,31 +707,67 @@ class EnumeratedValues(pysvd.classes.Derive):
             raise SyntaxError("At least one element of enumeratedValue is needed in enumeratedValues '{}'".format(
                 self.name if hasattr(self, 'name') else '<unknown>'))
 
+    def compile(self):
+        """Precompile lookup tables: exact values into a dict, don't care patterns into a list ordered by mask (most specific first)
+        and the default value.
+        """
+        exact = {}
+        patterns = []
+        default = None
+        for enumeratedValue in self.enumeratedValues:
+            if hasattr(enumeratedValue, 'pattern'):
+                patterns.append(enumeratedValue)
+            elif hasattr(enumeratedValue, 'value'):
+                exact.setdefault(enumeratedValue.value, enumeratedValue)
+            elif default is None and getattr(enumeratedValue, 'isDefault', False):
+                default = enumeratedValue
+
+        patterns.sort(key=lambda enumeratedValue: -bin(enumeratedValue.pattern[0]).count('1'))
+        patterns = tuple((enumeratedValue.pattern[0], enumeratedValue.pattern[1], enumeratedValue) for enumeratedValue in patterns)
+
+        matcher = (exact, patterns, default)
+        self.__dict__['_matcher'] = matcher
+        return matcher
+
+    def match(self, value):
+        """Find enumeratedValue matching the provided value. Returns None if nothing matches."""
+        matcher = self.__dict__.get('_matcher')
+        if matcher is None:
+            matcher = self.compile()
+
+        (exact, patterns, default) = matcher
+        result = exact.get(value)
+        if result is not None:
+            return result
+
+        for (mask, match, enumeratedValue) in patterns:
+            if value & mask == match:
+                return enumeratedValue
+        return default
+
 
 # /device/peripherals/peripheral/registers/.../enumeratedValue
 # http://www.keil.com/pack/doc/cmsis/svd/html/elem_registers.html#elem_enumeratedValue
-class EnumeratedValue(pysvd.classes.Parent):
+class EnumeratedValue(pysvd.classes.Parent, pysvd.classes.Digest):
     """An enumeratedValue defines a map between an unsigned integer and a string.
     """
 
+    digest_attributes = ['name', 'value', 'pattern', 'description', 'isDefault']
+
     def __init__(self, parent, node):
         super().__init__(parent, node)
 
-    def __eq__(self, other):
-        if not isinstance(other, EnumeratedValue):
-            return NotImplemented
-
-        return compare_attribute(self, other, 'name') and \
-            compare_attribute(self, other, 'value') and \
-            compare_attribute(self, other, 'description') and \
-            compare_attribute(self, other, 'isDefault')
-
     def parse(self, node):
         super().parse(node)
 
         self.add_attribute(node, 'name', pysvd.parser.Text)
         self.add_attribute(node, 'description', pysvd.parser.Text)
         self.add_attribute(node, 'value', pysvd.parser.Integer)
+
+        # Binary values with don't care bits keep (mask, match) pair
+        pattern = pysvd.parser.DontCare(pysvd.node.Element(node, 'value'))
+        if pattern is not None:
+            self.__dict__['pattern'] = pattern
         self.add_attribute(node, 'isDefault', pysvd.parser.Boolean)
 
         if not hasattr(self, 'value') and not hasattr(self, 'isDefault'):
@@ -0,0 +1,151 @@
+"""Reset value images of address blocks and vectorized snapshot diffs.
+
+Needs numpy, so this module is not imported by pysvd itself. Use Device.reset_image() or import pysvd.image explicitly.
+"""
+import bisect
+import collections
+
+import numpy
+
+import pysvd
+
+Change = collections.namedtuple('Change', ['path', 'address', 'old', 'new', 'fields'])
+Change.__doc__ = """Changed register with dict of changed fields (name -> (old, new))"""
+
+
+class Block(object):
+    """Contiguous reset image of one address block"""
+
+    def __init__(self, address, size, registers, properties, byteorder):
+        self.address = address
+        self.size = size
+        self.registers = registers
+
+        self.values = numpy.zeros(size, dtype=numpy.uint8)
+        self.masks = numpy.zeros(size, dtype=numpy.uint8)
+        self.covered = numpy.zeros(size, dtype=bool)
+        self.starts = numpy.array([register_address - address for (register_address, path, register) in registers], dtype=numpy.int64)
+        sizes = numpy.array([item[0] for item in properties], dtype=numpy.int64)
+
+        # Fill image vectorized per register size
+        prefix = '<' if byteorder == 'little' else '>'
+        for width in numpy.unique(sizes).tolist():
+            select = numpy.nonzero(sizes == width)[0]
+            dtype = numpy.dtype('{}u{}'.format(prefix, width))
+            limit = (1 << (8 * width)) - 1
+            offsets = (self.starts[select][:, None] + numpy.arange(width)).ravel()
+
+            values = numpy.array([properties[index][1] & properties[index][2] & limit for index in select.tolist()], dtype=dtype)
+            masks = numpy.array([properties[index][2] & limit for index in select.tolist()], dtype=dtype)
+            self.values[offsets] = values.view(numpy.uint8)
+            self.masks[offsets] = masks.view(numpy.uint8)
+            self.covered[offsets] = True
+
+
+def properties(address_map):
+    """List of (size in bytes, resetValue, resetMask) for each register of the address map.
+
+    Inherited values are resolved once per parent instead of walking the tree for every register.
+    """
+    inherited = {}
+    result = []
+    for (address, path, register) in address_map:
+        parent = register.parent
+        defaults = inherited.get(id(parent))
+        if defaults is None:
+            defaults = (getattr(parent, 'size', 32), getattr(parent, 'resetValue', 0), getattr(parent, 'resetMask', 0xFFFFFFFF))
+            inherited[id(parent)] = defaults
+
+        values = register.__dict__
+        result.append((values.get('size', defaults[0]) // 8, values.get('resetValue', defaults[1]), values.get('resetMask', defaults[2])))
+    return result
+
+
+class ResetImage(object):
+    """Reset values and reset masks of all registers, laid out as byte images over each address block"""
+
+    def __init__(self, device):
+        self.device = device
+        self.byteorder = pysvd.dump.byteorder(device)
+        self.blocks = []
+
+        address_map = device.address_map()
+        sizes = properties(address_map)
+
+        # Peripheral name of each register and sorted register indices of each peripheral, built in one pass over the address map
+        owners = [path.split('.', 1)[0] for (address, path, register) in address_map]
+        registers = {}
+        for (index, owner) in enumerate(owners):
+            registers.setdefault(owner, []).append(index)
+
+        for peripheral in device.peripherals:
+            ranges = [(peripheral.baseAddress + addressBlock.offset, addressBlock.size) for addressBlock in peripheral.addressBlocks
+                      if addressBlock.usage == pysvd.type.addressBlockUsage.registers]
+            if not ranges:
+                indices = registers.get(peripheral.name)
+                if not indices:
+                    continue
+                start = address_map[indices[0]][0]
+                ranges = [(start, max(address_map[index][0] + sizes[index][0] for index in indices) - start)]
+
+            # Derived peripherals may repeat address blocks of their base
+            for (address, size) in sorted(set(ranges)):
+                begin = bisect.bisect_left(address_map, (address, ))
+                end = bisect.bisect_left(address_map, (address + size, ))
+                indices = [index for index in range(begin, end)
+                           if address_map[index][0] + sizes[index][0] <= address + size and owners[index] == peripheral.name]
+                self.blocks.append(Block(address, size, [address_map[index] for index in indices], [sizes[index] for index in indices],
+                                         self.byteorder))
+
+    def snapshot(self, buffer, baseAddress):
+        """Split a buffer (bytes, mmap, memoryview) starting at baseAddress into a snapshot dict of block address -> array.
+        Blocks not completely inside the buffer are omitted. The arrays share memory with the buffer.
+        """
+        data = numpy.frombuffer(buffer, dtype=numpy.uint8)
+        snapshot = {}
+        for block in self.blocks:
+            offset = block.address - baseAddress
+            if offset >= 0 and offset + block.size <= len(data):
+                snapshot[block.address] = data[offset:offset + block.size]
+        return snapshot
+
+    def diff(self, snapshot, other=None):
+        """Compare snapshot with the reset image or with another snapshot and return list of changed registers.
+
+        Against the reset image only bits of resetMask are compared, two snapshots are compared on all register bits.
+        """
+        changes = []
+        for block in self.blocks:
+            new = snapshot.get(block.address)
+            if new is None:
+                continue
+
+            if other is None:
+                old = block.values
+                changed = ((new ^ old) & block.masks) != 0
+            else:
+                old = other.get(block.address)
+                if old is None:
+                    continue
+                changed = ((new ^ old) != 0) & block.covered
+
+            offsets = numpy.nonzero(changed)[0]
+            if len(offsets) == 0:
+                continue
+
+            indices = numpy.unique(numpy.searchsorted(block.starts, offsets, side='right') - 1)
+            for index in indices.tolist():
+                (address, path, register) = block.registers[index]
+                start = int(block.starts[index])
+                end = start + register.size // 8
+                old_value = int.from_bytes(old[start:end].tobytes(), self.byteorder)
+                new_value = int.from_bytes(new[start:end].tobytes(), self.byteorder)
+                if other is None:
+                    old_value &= register.resetMask
+                    new_value &= register.resetMask
+
+                old_fields = register.decode(old_value)
+                new_fields = register.decode(new_value)
+                fields = {name: (old_fields[name], new_fields[name]) for name in old_fields if old_fields[name] != new_fields[name]}
+                changes.append(Change(path, address, old_value, new_value, fields))
+        return changes
@@ -0,0 +1,129 @@
+"""Persistent index of identical peripherals and registers over a corpus of SVD files.
+
+Structural digests of peripherals and registers are mapped to every occurrence (device, name, file). Files are parsed in a process pool
+and only again if their sha256 changed. The index is stored as JSON.
+"""
+import collections
+import concurrent.futures
+import hashlib
+import json
+import os
+import xml.etree.ElementTree as ET
+
+import pysvd
+
+Occurrence = collections.namedtuple('Occurrence', ['device', 'name', 'filename'])
+Occurrence.__doc__ = """Peripheral or register (name 'PERIPHERAL.REGISTER') of a device"""
+
+
+def sha256(filename):
+    """Get sha256 hex digest of file content"""
+    hasher = hashlib.sha256()
+    with open(filename, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def index_file(filename, digest=None):
+    """Parse SVD file and return index entry with lists of (name, digest) of peripherals and registers.
+
+    Registers without fields share the same structural digest and are skipped. Parse errors are stored in the entry, so the file is not
+    parsed again until it changes.
+    """
+    entry = {'sha256': digest or sha256(filename)}
+    try:
+        device = pysvd.element.Device(ET.parse(filename).getroot())
+    except Exception as e:
+        entry['error'] = str(e)
+        return entry
+
+    entry['device'] = device.name
+    entry['peripherals'] = [(peripheral.name, peripheral.digest_struct()) for peripheral in device.peripherals]
+    entry['registers'] = [('{}.{}'.format(peripheral.name, register.name), register.digest_struct())
+                          for peripheral in device.peripherals for register in peripheral.registers if register.fields]
+    return entry
+
+
+class CorpusIndex(object):
+    """Index of structural digests over SVD files, optionally loaded from and saved to filename"""
+
+    version = 1
+
+    def __init__(self, filename=None):
+        self.filename = filename
+        self.files = {}
+        if filename is not None and os.path.exists(filename):
+            self.load(filename)
+        else:
+            self.rebuild()
+
+    def load(self, filename):
+        """Load index from JSON file"""
+        with open(filename, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        if data.get('version') != self.version:
+            raise ValueError("Unsupported index version '{}' in '{}'".format(data.get('version'), filename))
+
+        self.files = data['files']
+        self.rebuild()
+
+    def save(self, filename=None):
+        """Save index to JSON file, the file is replaced atomically if changed"""
+        with pysvd.output.Writer(filename or self.filename) as file:
+            json.dump({'version': self.version, 'files': self.files}, file, separators=(',', ':'))
+
+    def rebuild(self):
+        """Rebuild lookup tables digest -> occurrences from file entries"""
+        self.peripherals = {}
+        self.registers = {}
+        for (filename, entry) in sorted(self.files.items()):
+            device = entry.get('device')
+            for (name, digest) in entry.get('peripherals', []):
+                self.peripherals.setdefault(digest, []).append(Occurrence(device, name, filename))
+            for (name, digest) in entry.get('registers', []):
+                self.registers.setdefault(digest, []).append(Occurrence(device, name, filename))
+
+    def update(self, directory, processes=None, extension='.svd'):
+        """Index all SVD files below directory. Only new and changed files are parsed, entries of removed files are dropped.
+
+        Returns list of parsed files.
+        """
+        filenames = set()
+        for (root, dirs, files) in os.walk(directory):
+            filenames.update(os.path.abspath(os.path.join(root, name)) for name in files if name.lower().endswith(extension))
+
+        prefix = os.path.join(os.path.abspath(directory), '')
+        for filename in [filename for filename in self.files if filename.startswith(prefix) and filename not in filenames]:
+            del self.files[filename]
+
+        changed = []
+        for filename in sorted(filenames):
+            digest = sha256(filename)
+            if self.files.get(filename, {}).get('sha256') != digest:
+                changed.append((filename, digest))
+
+        if changed:
+            parameters = ([filename for (filename, digest) in changed], [digest for (filename, digest) in changed])
+            if processes == 1:
+                entries = list(map(index_file, *parameters))
+            else:
+                with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+                    entries = list(executor.map(index_file, *parameters))
+            for ((filename, digest), entry) in zip(changed, entries):
+                self.files[filename] = entry
+
+        self.rebuild()
+        return [filename for (filename, digest) in changed]
+
+    def errors(self):
+        """Get dict of files which could not be parsed -> error message"""
+        return {filename: entry['error'] for (filename, entry) in self.files.items() if 'error' in entry}
+
+    def find(self, element):
+        """Get list of occurrences of peripheral or register structural equal to element"""
+        if isinstance(element, pysvd.element.Peripheral):
+            return self.peripherals.get(element.digest_struct(), [])
+        elif isinstance(element, pysvd.element.Register):
+            return self.registers.get(element.digest_struct(), [])
+        raise TypeError("Can not find element of type '{}' in index".format(element.__class__.__name__))
@@ -0,0 +1,120 @@
+"""Interrupt table of a device.
+
+The interrupts of all peripherals are sorted once by value and name. Interrupts listed by several peripherals (same name and value) are
+kept once, conflicts (several names for one value or several values for one name) and gaps in the table of deviceNumInterrupts entries
+are collected for generators and checks. The core exceptions in front of the interrupts depend on the architecture of the cpu.
+"""
+import collections
+
+CoreException = collections.namedtuple('CoreException', ['number', 'name', 'handler'])
+CoreException.__doc__ = """Core exception with exception number, CMSIS name (of enumerator <name>_IRQn) and handler name"""
+
+# Core exceptions of ARMv6-M and ARMv8-M baseline, ARMv7-M and ARMv8-M mainline add the fault and debug monitor exceptions
+baseline_exceptions = (
+    CoreException(2, 'NonMaskableInt', 'NMI_Handler'),
+    CoreException(3, 'HardFault', 'HardFault_Handler'),
+    CoreException(11, 'SVCall', 'SVC_Handler'),
+    CoreException(14, 'PendSV', 'PendSV_Handler'),
+    CoreException(15, 'SysTick', 'SysTick_Handler'),
+)
+mainline_exceptions = tuple(sorted(baseline_exceptions + (
+    CoreException(4, 'MemoryManagement', 'MemManage_Handler'),
+    CoreException(5, 'BusFault', 'BusFault_Handler'),
+    CoreException(6, 'UsageFault', 'UsageFault_Handler'),
+    CoreException(12, 'DebugMonitor', 'DebugMon_Handler'),
+)))
+secure_exceptions = tuple(sorted(mainline_exceptions + (CoreException(7, 'SecureFault', 'SecureFault_Handler'), )))
+
+
+def core_exceptions(cpu):
+    """Get core exceptions of a Cortex-M cpu (element or None), empty for other cores"""
+    name = getattr(getattr(cpu, 'name', None), 'name', None)
+    if name in ('CM0', 'CM0PLUS', 'CM1', 'SC000', 'CM23', 'ARMV8MBL'):
+        return baseline_exceptions
+    if name in ('CM3', 'SC300', 'CM4', 'CM7'):
+        return mainline_exceptions
+    if name in ('CM33', 'CM35P', 'ARMV8MML'):
+        return secure_exceptions
+    return ()
+
+
+class InterruptIndex(object):
+    """Index of all interrupts of a device, iterates over the de-duplicated interrupts sorted by value and name.
+
+    * peripherals: (name, value) -> list of peripherals with this interrupt
+    * values: value -> list of interrupts with this value
+    * conflicts: value -> list of interrupts with different names for this value
+    * duplicates: name -> list of interrupts with different values for this name
+    * count: deviceNumInterrupts of the cpu or None
+    * gaps: values below count (or the highest value) without interrupt
+    * out_of_range: interrupts with value of count or higher
+    * exceptions: core exceptions of the cpu (empty if not a Cortex-M)
+    """
+
+    def __init__(self, device):
+        items = [interrupt for peripheral in device.peripherals for interrupt in peripheral.interrupts]
+        # Sort is stable, equal interrupts keep peripheral order
+        items.sort(key=lambda interrupt: (interrupt.value, interrupt.name))
+
+        self.interrupts = []
+        self.peripherals = {}
+        for interrupt in items:
+            peripherals = self.peripherals.get((interrupt.name, interrupt.value))
+            if peripherals is None:
+                self.peripherals[(interrupt.name, interrupt.value)] = [interrupt.parent]
+                self.interrupts.append(interrupt)
+            else:
+                peripherals.append(interrupt.parent)
+
+        self.values = {}
+        names = {}
+        for interrupt in self.interrupts:
+            self.values.setdefault(interrupt.value, []).append(interrupt)
+            names.setdefault(interrupt.name, []).append(interrupt)
+        self.conflicts = {value: interrupts for (value, interrupts) in self.values.items() if len(interrupts) > 1}
+        self.duplicates = {name: interrupts for (name, interrupts) in names.items() if len(interrupts) > 1}
+
+        cpu = getattr(device, 'cpu', None)
+        self.count = getattr(cpu, 'deviceNumInterrupts', None)
+        end = self.count if self.count is not None else (self.interrupts[-1].value + 1 if self.interrupts else 0)
+        self.gaps = [value for value in range(end) if value not in self.values]
+        self.out_of_range = [interrupt for interrupt in self.interrupts if self.count is not None and interrupt.value >= self.count]
+        self.exceptions = core_exceptions(cpu)
+
+    def __iter__(self):
+        return iter(self.interrupts)
+
+    def __len__(self):
+        return len(self.interrupts)
+
+    def unique(self):
+        """Get interrupts with unique names, for names with several values the lowest value is used"""
+        result = []
+        for interrupt in self.interrupts:
+            duplicates = self.duplicates.get(interrupt.name)
+            if duplicates is None or duplicates[0] is interrupt:
+                result.append(interrupt)
+        return result
+
+    def vectors(self):
+        """Get list of interrupts indexed by value with deviceNumInterrupts entries (at least up to the highest value), the first
+        interrupt of conflicting values and None for gaps"""
+        size = max(self.count or 0, self.interrupts[-1].value + 1 if self.interrupts else 0)
+        result = [None] * size
+        for (value, interrupts) in self.values.items():
+            result[value] = interrupts[0]
+        return result
+
+    def problems(self):
+        """Get list of messages about conflicts, gaps and interrupts out of range"""
+        messages = []
+        for (value, interrupts) in sorted(self.conflicts.items()):
+            messages.append("Interrupt {} has several names: {}".format(value, ', '.join(interrupt.name for interrupt in interrupts)))
+        for (name, interrupts) in sorted(self.duplicates.items()):
+            values = ', '.join(str(interrupt.value) for interrupt in interrupts)
+            messages.append("Interrupt '{}' has several values: {}".format(name, values))
+        for interrupt in self.out_of_range:
+            messages.append("Interrupt '{}' value {} exceeds deviceNumInterrupts {}".format(interrupt.name, interrupt.value, self.count))
+        if self.gaps:
+            messages.append("Interrupts without name: {}".format(', '.join(str(value) for value in self.gaps)))
+        return messages
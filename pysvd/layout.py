@@ -0,0 +1,127 @@
+"""C struct layout of peripherals and clusters.
+
+Members are sorted by offset, gaps are filled with reserved entries and overlapping members (alternate registers and clusters, see
+alternateRegister, alternateGroup and alternateCluster) are grouped into unions. Structs are padded to their alignment, like a compiler
+does, and cluster arrays to their dimIncrement. Layouts are cached by structural digest, so identical and derived peripherals share one
+computed layout.
+"""
+import collections
+import re
+
+import pysvd
+
+Member = collections.namedtuple('Member', ['offset', 'size', 'name', 'count', 'element'])
+Member.__doc__ = """Register or cluster of a struct, count > 1 for arrays (size is the size of all elements)"""
+
+Reserved = collections.namedtuple('Reserved', ['offset', 'size'])
+Reserved.__doc__ = """Padding between members"""
+
+Union = collections.namedtuple('Union', ['offset', 'size', 'members'])
+Union.__doc__ = """Overlapping members, members with higher offset than the union need leading padding"""
+
+Layout = collections.namedtuple('Layout', ['size', 'alignment', 'entries'])
+Layout.__doc__ = """Layout of a peripheral or cluster, entries are members, reserved paddings and unions sorted by offset"""
+
+
+def identifier(name):
+    """Get C identifier of an element name"""
+    return re.sub(r'[^0-9A-Za-z_]', '', name.replace('[%s]', '').replace('%s', ''))
+
+
+def array_name(element):
+    """Get C array name of a dim array element (name with '[%s]' or with '%s' indexed from 0 without dimIndex), otherwise None"""
+    name = element.node.findtext('name', '')
+    if '[%s]' in name or '%s' in name and element.node.find('dim') is not None and element.node.find('dimIndex') is None:
+        return identifier(name)
+    return None
+
+
+def increment(cluster):
+    """Get address increment of cluster array elements expanded by pysvd, 0 for single clusters"""
+    if array_name(cluster) is None:
+        return 0
+    siblings = [item for item in cluster.parent.clusters if item.node is cluster.node]
+    return siblings[1].addressOffset - siblings[0].addressOffset if len(siblings) > 1 else 0
+
+
+def members(container, cache=None):
+    """Get list of members of peripheral or cluster sorted by offset. Elements of a dim array expanded by pysvd share their node and
+    become one array member, if the increment matches the element size."""
+    result = []
+    for elements in (container.registers, container.clusters):
+        index = 0
+        while index < len(elements):
+            element = elements[index]
+            if isinstance(element, pysvd.element.Register):
+                size = element.size // 8
+            else:
+                size = layout(element, cache).size
+
+            end = index + 1
+            while end < len(elements) and elements[end].node is element.node:
+                end += 1
+
+            name = array_name(element)
+            count = end - index
+            if name is not None and (count == 1 or elements[index + 1].addressOffset - element.addressOffset == size):
+                result.append(Member(element.addressOffset, size * count, name, count, element))
+            else:
+                result += [Member(item.addressOffset, size, identifier(item.name), 1, item) for item in elements[index:end]]
+            index = end
+
+    result.sort(key=lambda member: (member.offset, -member.size))
+    return result
+
+
+def layout(container, cache=None):
+    """Get layout of peripheral or cluster. It is computed in a single pass over the members and stored in the element and in the cache
+    dict (if given) by structural digest, elements of the cached layout may belong to another structural equal container."""
+    result = container.__dict__.get('_layout')
+    if result is not None:
+        return result
+
+    key = None
+    if cache is not None:
+        step = increment(container) if isinstance(container, pysvd.element.Cluster) else 0
+        key = (container.digest_struct(), step)
+        result = cache.get(key)
+    if result is None:
+        result = compute(container, cache)
+        if key is not None:
+            cache[key] = result
+
+    container.__dict__['_layout'] = result
+    return result
+
+
+def compute(container, cache=None):
+    """Compute layout of peripheral or cluster, nested clusters are looked up in cache"""
+    entries = []
+    end = 0
+    alignment = 1
+    for member in members(container, cache):
+        if isinstance(member.element, pysvd.element.Register):
+            alignment = max(alignment, member.element.size // 8)
+        else:
+            alignment = max(alignment, layout(member.element, cache).alignment)
+
+        if entries and member.offset < end:
+            # Overlapping member
+            last = entries[-1]
+            if isinstance(last, Union):
+                entries[-1] = Union(last.offset, max(last.size, member.offset + member.size - last.offset), last.members + [member])
+            else:
+                entries[-1] = Union(last.offset, max(last.size, member.offset + member.size - last.offset), [last, member])
+        else:
+            if member.offset > end:
+                entries.append(Reserved(end, member.offset - end))
+            entries.append(member)
+        end = max(end, member.offset + member.size)
+
+    size = -(-end // alignment) * alignment
+    if isinstance(container, pysvd.element.Cluster):
+        size = max(size, increment(container))
+    if size > end:
+        entries.append(Reserved(end, size - end))
+
+    return Layout(size, alignment, entries)
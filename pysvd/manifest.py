@@ -0,0 +1,88 @@
+"""Manifest of generated outputs for incremental regeneration.
+
+Generators store the digest of each rendered peripheral together with its output file or rendered fragment. On the next run unchanged
+peripherals are neither rendered nor written, so file modification times stay untouched. Output files of peripherals removed from the
+device are deleted. Without manifest file everything is rendered.
+"""
+import hashlib
+import json
+import os
+
+import pysvd
+
+
+def fingerprint(peripheral, *extra):
+    """Get digest of everything a generator renders of a peripheral: content digest, interrupts, pysvd version and extra values"""
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(peripheral.digest().encode())
+    for interrupt in peripheral.interrupts:
+        hasher.update('\x1e{}={}'.format(interrupt.name, interrupt.value).encode())
+    for value in (pysvd.__version__, ) + extra:
+        hasher.update('\x1e{!r}'.format(value).encode())
+    return hasher.hexdigest()
+
+
+def load(filename, names, force=False):
+    """Get manifest of filename (None for no manifest file) with entries of names, entries and output files of other names are removed"""
+    manifest = Manifest(filename, force)
+    manifest.prune(names)
+    return manifest
+
+
+class Manifest(object):
+    """Entries name -> {'digest': ..., 'file': ... or 'fragment': ...} stored as JSON file, nothing is stored without filename. Forced
+    manifests return no entries, so everything gets rendered again."""
+
+    def __init__(self, filename=None, force=False):
+        self.filename = filename
+        self.force = force
+        self.entries = {}
+        self.modified = False
+        if filename is None:
+            return
+        try:
+            with open(filename, 'r', encoding='utf-8') as file:
+                self.entries = json.load(file)
+        except (FileNotFoundError, ValueError):
+            # Missing or broken manifest, everything gets rendered
+            pass
+
+    def get(self, name, digest):
+        """Get entry of name if digest is unchanged (and its file still exists), otherwise None"""
+        entry = self.entries.get(name)
+        if self.force or entry is None or entry.get('digest') != digest:
+            return None
+        if 'file' in entry and not os.path.exists(entry['file']):
+            return None
+        return entry
+
+    def set(self, name, digest, **entry):
+        """Set entry of name with file or fragment"""
+        if self.filename is None:
+            return
+        entry['digest'] = digest
+        if self.entries.get(name) != entry:
+            self.entries[name] = entry
+            self.modified = True
+
+    def fragment(self, name, digest, render):
+        """Get fragment of name, rendered by render() if digest changed"""
+        entry = self.get(name, digest)
+        if entry is None or 'fragment' not in entry:
+            entry = {'fragment': render()}
+            self.set(name, digest, **entry)
+        return entry['fragment']
+
+    def prune(self, names):
+        """Remove entries not in names and their output files"""
+        for name in set(self.entries) - set(names):
+            entry = self.entries.pop(name)
+            if 'file' in entry and os.path.exists(entry['file']):
+                os.remove(entry['file'])
+            self.modified = True
+
+    def save(self):
+        """Save manifest if modified"""
+        if self.modified and self.filename is not None:
+            pysvd.output.write(self.filename, json.dumps(self.entries, indent=1, sort_keys=True))
+            self.modified = False
@@ -0,0 +1,110 @@
+"""Buffered, atomic output files for generators.
+
+Output is written through a large buffer into a temporary file next to the target, optionally gzip or xz compressed. On close the
+temporary file replaces the target only if the content changed, so build tools see no spurious modifications. If writing fails, the
+temporary file is removed and the target stays untouched.
+"""
+import gzip
+import io
+import lzma
+import os
+
+# Compression by file extension
+extensions = {
+    '.gz': 'gzip',
+    '.xz': 'xz',
+}
+
+
+def compression_of(filename):
+    """Get compression of filename by its extension, None for uncompressed files"""
+    return extensions.get(os.path.splitext(filename)[1])
+
+
+def same(filename, other, size=1 << 20):
+    """Check if files have equal content"""
+    try:
+        if os.path.getsize(filename) != os.path.getsize(other):
+            return False
+        with open(filename, 'rb') as file, open(other, 'rb') as file_other:
+            while True:
+                block = file.read(size)
+                if block != file_other.read(size):
+                    return False
+                if not block:
+                    return True
+    except FileNotFoundError:
+        return False
+
+
+class Writer(object):
+    """File like object for text (or bytes if binary is set) replacing filename on close if the content changed. The compression
+    ('gzip', 'xz' or None) defaults to the one of the file extension, gzip output has no timestamp to be reproducible.
+
+    Use as context manager, on exceptions the output is discarded.
+    """
+
+    def __init__(self, filename, binary=False, compression=None, buffering=1 << 20, encoding='utf-8'):
+        if compression is None:
+            compression = compression_of(filename)
+        if compression not in (None, 'gzip', 'xz'):
+            raise ValueError("Unknown compression '{}'".format(compression))
+
+        self.filename = filename
+        self.temp = '{}.{}.tmp'.format(filename, os.getpid())
+        self.changed = None
+
+        self.raw = open(self.temp, 'wb', buffering=buffering)
+        if compression == 'gzip':
+            self.stream = gzip.GzipFile(filename='', mode='wb', fileobj=self.raw, mtime=0)
+        elif compression == 'xz':
+            self.stream = lzma.LZMAFile(self.raw, 'wb')
+        else:
+            self.stream = self.raw
+        self.file = self.stream if binary else io.TextIOWrapper(self.stream, encoding=encoding)
+
+    def write(self, data):
+        return self.file.write(data)
+
+    def writelines(self, lines):
+        self.file.writelines(lines)
+
+    def _close_files(self):
+        self.file.close()
+        self.raw.close()
+
+    def close(self):
+        """Close output and replace file if changed. Returns True if the file was replaced."""
+        if self.changed is None:
+            self._close_files()
+            self.changed = not same(self.temp, self.filename)
+            if self.changed:
+                os.replace(self.temp, self.filename)
+            else:
+                os.remove(self.temp)
+        return self.changed
+
+    def discard(self):
+        """Close output and remove it, file stays untouched"""
+        if self.changed is None:
+            try:
+                self._close_files()
+            finally:
+                os.remove(self.temp)
+            self.changed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def write(filename, data, compression=None):
+    """Write text or bytes to file if its content differs. Returns True if the file was written."""
+    with Writer(filename, isinstance(data, bytes), compression) as file:
+        file.write(data)
+    return file.changed
@@ -33,6 +33,32 @@ def Integer(value, default=None):
         return int(value)
 
 
+def DontCare(value, default=None):
+    """Get (mask, match) pair from a binary value with don't care bits 'x'.
+    If None or the value has no don't care bits, default is returned
+    """
+
+    if value is None:
+        return default
+
+    value = value.lower()
+
+    # Binary '0b' or '#'
+    if value.startswith('0b'):
+        value = value[2:]
+    elif value.startswith('#'):
+        value = value[1:]
+    else:
+        return default
+
+    if 'x' not in value:
+        return default
+
+    mask = int(''.join('0' if digit == 'x' else '1' for digit in value), 2)
+    match = int(value.replace('x', '0'), 2)
+    return (mask, match)
+
+
 def Boolean(value, default=None):
     """Get boolean value from the provided value.
     If None, default is returned
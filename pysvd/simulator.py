@@ -0,0 +1,186 @@
+"""Register file simulator for host-side tests.
+
+Every register is stored in one bytearray. Access and write/read side effects of registers and fields are compiled into per address
+read and write functions, so a simulated bus access is a dict lookup and one call.
+"""
+import pysvd
+
+# Bit masks of an address, index into the mask list of compile_masks()
+(READ, MODIFY, ONCE, READ_CLEAR, READ_SET) = range(5)
+modified = [
+    pysvd.type.modifiedWriteValues.oneToClear,
+    pysvd.type.modifiedWriteValues.oneToSet,
+    pysvd.type.modifiedWriteValues.oneToToggle,
+    pysvd.type.modifiedWriteValues.zeroToClear,
+    pysvd.type.modifiedWriteValues.zeroToSet,
+    pysvd.type.modifiedWriteValues.zeroToToggle,
+    pysvd.type.modifiedWriteValues.clear,
+    pysvd.type.modifiedWriteValues.set,
+]
+
+readable = {pysvd.type.access.read_only, pysvd.type.access.read_write, pysvd.type.access.read_writeOnce}
+writable = {pysvd.type.access.write_only, pysvd.type.access.read_write}
+writable_once = {pysvd.type.access.writeOnce, pysvd.type.access.read_writeOnce}
+
+
+def compile_masks(register):
+    """Get list of bit masks: READ, MODIFY, ONCE, READ_CLEAR, READ_SET followed by one mask per modified write value."""
+    masks = [0] * (READ_SET + 1 + len(modified))
+
+    size = register.size
+    parts = [(0, size, register)]
+    covered = 0
+    for field in register.fields:
+        parts.append((field.bitOffset, field.bitWidth, field))
+        covered |= ((1 << field.bitWidth) - 1) << field.bitOffset
+
+    for (bitOffset, bitWidth, element) in parts:
+        mask = ((1 << bitWidth) - 1) << bitOffset
+        if element is register:
+            # Register semantics apply to bits without field
+            mask &= ~covered
+
+        access = getattr(element, 'access', pysvd.type.access.read_write)
+        modifiedWriteValues = element.modifiedWriteValues
+        if modifiedWriteValues == pysvd.type.modifiedWriteValues.modify:
+            modifiedWriteValues = register.modifiedWriteValues
+        readAction = getattr(element, 'readAction', getattr(register, 'readAction', None))
+
+        if access in readable:
+            masks[READ] |= mask
+            if readAction == pysvd.type.readAction.clear:
+                masks[READ_CLEAR] |= mask
+            elif readAction == pysvd.type.readAction.set:
+                masks[READ_SET] |= mask
+
+        if access in writable_once:
+            masks[ONCE] |= mask
+        elif access in writable:
+            if modifiedWriteValues in modified:
+                masks[READ_SET + 1 + modified.index(modifiedWriteValues)] |= mask
+            else:
+                masks[MODIFY] |= mask
+
+    return masks
+
+
+class RegisterFile(object):
+    """Emulated register space of a device. Only accesses with the size of the register at its address are supported."""
+
+    def __init__(self, device):
+        self.device = device
+        self.byteorder = pysvd.dump.byteorder(device)
+        self.paths = {}
+        self.reads = {}
+        self.writes = {}
+
+        # Registers sharing an address (alternate registers) share their storage
+        slots = {}
+        for (address, path, register) in device.address_map():
+            self.paths[path] = address
+            slot = slots.get(address)
+            if slot is None:
+                slots[address] = slot = [register.size // 8, 0, [0] * (READ_SET + 1 + len(modified))]
+            slot[0] = max(slot[0], register.size // 8)
+            slot[1] |= register.resetValue & register.resetMask
+            slot[2] = [lhs | rhs for (lhs, rhs) in zip(slot[2], compile_masks(register))]
+
+        self.buffer = bytearray(sum(slot[0] for slot in slots.values()))
+        self.written = bytearray(len(slots))
+        self.layout = {}
+        self.resetValues = []
+
+        offset = 0
+        for (index, address) in enumerate(sorted(slots)):
+            (size, resetValue, masks) = slots[address]
+            self.layout[address] = (offset, size)
+            self.resetValues.append((offset, size, resetValue))
+            self.reads[address] = self.compile_read(offset, size, masks)
+            self.writes[address] = self.compile_write(index, offset, size, masks)
+            offset += size
+
+        self.reset()
+
+    def compile_read(self, offset, size, masks):
+        """Build read function of an address"""
+        buffer = self.buffer
+        order = self.byteorder
+        end = offset + size
+        readMask = masks[READ]
+        clearMask = masks[READ_CLEAR]
+        setMask = masks[READ_SET]
+
+        if not clearMask and not setMask:
+            def read():
+                return int.from_bytes(buffer[offset:end], order) & readMask
+        else:
+            def read():
+                value = int.from_bytes(buffer[offset:end], order)
+                buffer[offset:end] = ((value & ~clearMask) | setMask).to_bytes(size, order)
+                return value & readMask
+        return read
+
+    def compile_write(self, index, offset, size, masks):
+        """Build write function of an address"""
+        buffer = self.buffer
+        written = self.written
+        order = self.byteorder
+        end = offset + size
+        limit = (1 << (8 * size)) - 1
+        modifyMask = masks[MODIFY]
+        onceMask = masks[ONCE]
+        (oneToClear, oneToSet, oneToToggle, zeroToClear, zeroToSet, zeroToToggle, clearMask, setMask) = masks[READ_SET + 1:]
+
+        if not any(masks[ONCE:]) and not any(masks[READ_SET + 1:]):
+            # Plain read-write and read-only bits
+            def write(value):
+                old = int.from_bytes(buffer[offset:end], order)
+                buffer[offset:end] = ((old & ~modifyMask) | (value & modifyMask)).to_bytes(size, order)
+        else:
+            def write(value):
+                new = int.from_bytes(buffer[offset:end], order)
+                new = (new & ~modifyMask) | (value & modifyMask)
+                new = ((new & ~(value & oneToClear)) | (value & oneToSet)) ^ (value & oneToToggle)
+                inverse = ~value
+                new = ((new & ~(inverse & zeroToClear)) | (inverse & zeroToSet)) ^ (inverse & zeroToToggle)
+                new = (new & ~clearMask) | setMask
+                if onceMask and not written[index]:
+                    new = (new & ~onceMask) | (value & onceMask)
+                    written[index] = 1
+                buffer[offset:end] = (new & limit).to_bytes(size, order)
+        return write
+
+    def reset(self):
+        """Set all registers to their reset value"""
+        for (offset, size, resetValue) in self.resetValues:
+            self.buffer[offset:offset + size] = resetValue.to_bytes(size, self.byteorder)
+        self.written[:] = bytes(len(self.written))
+
+    def read(self, address):
+        """Bus read access with read side effects"""
+        try:
+            return self.reads[address]()
+        except KeyError:
+            raise KeyError("No register at address 0x{:08X}".format(address))
+
+    def write(self, address, value):
+        """Bus write access with access rights and write side effects"""
+        try:
+            write = self.writes[address]
+        except KeyError:
+            raise KeyError("No register at address 0x{:08X}".format(address))
+        write(value)
+
+    def peek(self, address):
+        """Get register value without side effects (hardware side)"""
+        (offset, size) = self.layout[address]
+        return int.from_bytes(self.buffer[offset:offset + size], self.byteorder)
+
+    def poke(self, address, value):
+        """Set register value without side effects (hardware side)"""
+        (offset, size) = self.layout[address]
+        self.buffer[offset:offset + size] = value.to_bytes(size, self.byteorder)
+
+    def address(self, path):
+        """Get address of register by path (e.g. 'TIMER0.CR')"""
+        return self.paths[path]
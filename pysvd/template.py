@@ -0,0 +1,96 @@
+"""Compiled text templates for generators.
+
+Templates use the str.format syntax with named fields, e.g. '#define {name}_Pos {offset}\\n'. The field names of a template are fixed
+by the generator and map to the positions of the flat context tuples it renders from. Each template is compiled once into an f-string
+function, so rendering does no parsing and no name lookups. Generators define default templates, which can be overridden by files
+'<name>.tmpl' of a directory.
+"""
+import hashlib
+import os
+import string
+
+
+def literal(text):
+    """Escape text for a single quoted f-string"""
+    return text.encode('unicode_escape').decode('ascii').replace("'", "\\'").replace('{', '{{').replace('}', '}}')
+
+
+def source(text, fields):
+    """Get f-string body rendering text from context tuple 'c' with given field names"""
+    index = {name: position for (position, name) in enumerate(fields)}
+    parts = []
+    automatic = 0
+    for (prefix, name, spec, conversion) in string.Formatter().parse(text):
+        parts.append(literal(prefix))
+        if name is None:
+            continue
+
+        if name == '':
+            position = automatic
+            automatic += 1
+        elif name.isdigit():
+            position = int(name)
+        elif name in index:
+            position = index[name]
+        else:
+            raise KeyError("Unknown field '{}' in template, expected one of {}".format(name, ', '.join(fields)))
+        if position >= len(fields):
+            raise IndexError("Field index {} out of range in template".format(position))
+
+        parts.append('{{c[{}]{}{}}}'.format(position, '!' + conversion if conversion else '', ':' + source(spec, fields) if spec else ''))
+    return ''.join(parts)
+
+
+def compile_template(text, fields):
+    """Compile template text into a function rendering a context tuple"""
+    return eval("lambda c: f'{}'".format(source(text, fields)), {'__builtins__': {}})
+
+
+class Template(object):
+    """Template text with named fields, rendered from tuples of field values"""
+
+    def __init__(self, text, fields):
+        self.text = text
+        self.fields = tuple(fields)
+        self.render = compile_template(text, self.fields)
+
+    def __call__(self, *values):
+        """Render template from field values"""
+        return self.render(values)
+
+    def join(self, contexts):
+        """Render template for each context tuple and join the results"""
+        return ''.join(map(self.render, contexts))
+
+
+class Templates(object):
+    """Named templates of a generator, defaults is a dict name -> (text, fields)"""
+
+    extension = '.tmpl'
+
+    def __init__(self, defaults, directory=None):
+        self.defaults = defaults
+        self.templates = {name: Template(text, fields) for (name, (text, fields)) in defaults.items()}
+        if directory is not None:
+            self.load(directory)
+
+    def __getitem__(self, name):
+        return self.templates[name]
+
+    def digest(self):
+        """Get digest of all template texts, changes of overrides invalidate rendered output"""
+        hasher = hashlib.blake2b(digest_size=16)
+        for name in sorted(self.templates):
+            hasher.update('\x1e{}={}'.format(name, self.templates[name].text).encode())
+        return hasher.hexdigest()
+
+    def load(self, directory):
+        """Override templates by files '<name>.tmpl' of directory. Unknown names raise KeyError."""
+        for filename in sorted(os.listdir(directory)):
+            (name, extension) = os.path.splitext(filename)
+            if extension != self.extension:
+                continue
+            if name not in self.defaults:
+                raise KeyError("Unknown template '{}' in '{}'".format(name, directory))
+            with open(os.path.join(directory, filename), 'r', encoding='utf-8') as file:
+                self.templates[name] = Template(file.read(), self.defaults[name][1])
@@ -0,0 +1,163 @@
+"""Replay bus traces against a shadow register state and report field changes.
+
+Traces are read in chunks of numpy records (timestamp, address, value, write). Addresses are resolved through an interval index and
+changes against the shadow state are detected vectorized per chunk, so memory stays constant for any trace length.
+
+Needs numpy, so this module is not imported by pysvd itself.
+"""
+import collections
+import concurrent.futures
+import itertools
+
+import numpy
+
+import pysvd
+import pysvd.image
+
+record = numpy.dtype([('timestamp', '<u8'), ('address', '<u8'), ('value', '<u8'), ('write', 'u1')])
+
+
+class Event(collections.namedtuple('Event', ['timestamp', 'path', 'field', 'old', 'new'])):
+    """Field change of a register (field is None for registers without fields)"""
+
+    __slots__ = ()
+
+    def __str__(self):
+        if self.field is None:
+            return "{}: {} -> {}".format(self.path, self.old, self.new)
+        return "{}.{}: {} -> {}".format(self.path, self.field, self.old, self.new)
+
+
+class AddressIndex(object):
+    """Interval index over all registers of a device"""
+
+    def __init__(self, device):
+        address_map = device.address_map()
+        properties = pysvd.image.properties(address_map)
+
+        self.paths = [path for (address, path, register) in address_map]
+        self.starts = numpy.array([address for (address, path, register) in address_map], dtype=numpy.uint64)
+        self.resetValues = numpy.array([item[1] & item[2] for item in properties], dtype=numpy.uint64)
+        self.fields = [tuple((field.name, field.bitOffset, (1 << field.bitWidth) - 1) for field in register.fields)
+                       for (address, path, register) in address_map]
+
+    @classmethod
+    def get(cls, device):
+        """Get index of device, build once and cached in device"""
+        index = device.__dict__.get('_address_index')
+        if index is None:
+            index = cls(device)
+            device.__dict__['_address_index'] = index
+        return index
+
+    def resolve(self, addresses):
+        """Get register index for each address, -1 for addresses not starting a register"""
+        indices = numpy.searchsorted(self.starts, addresses, side='right').astype(numpy.int64) - 1
+        valid = indices >= 0
+        valid[valid] = self.starts[indices[valid]] == addresses[valid]
+        indices[~valid] = -1
+        return indices
+
+
+def parse_lines(lines):
+    """Parse CSV lines 'timestamp,address,value,r/w' into numpy records"""
+    chunk = numpy.empty(len(lines), dtype=record)
+    count = 0
+    for line in lines:
+        parts = line.split(',')
+        if len(parts) != 4:
+            continue
+        access = parts[3].strip().lower()
+        chunk[count] = (int(parts[0], 0), int(parts[1], 0), int(parts[2], 0), access in ('w', 'write', '1'))
+        count += 1
+    return chunk[:count]
+
+
+def read_csv(filename, chunk_size=1 << 16, processes=None):
+    """Generator of record chunks from a CSV trace file. With processes > 1, chunks are parsed in a process pool with a bounded number
+    of chunks in flight.
+    """
+    with open(filename, 'r') as file:
+        lines = iter(lambda: list(itertools.islice(file, chunk_size)), [])
+        if not processes or processes < 2:
+            for chunk in lines:
+                yield parse_lines(chunk)
+            return
+
+        with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+            pending = collections.deque(executor.submit(parse_lines, chunk) for chunk in itertools.islice(lines, 2 * processes))
+            while pending:
+                result = pending.popleft().result()
+                for chunk in itertools.islice(lines, 1):
+                    pending.append(executor.submit(parse_lines, chunk))
+                yield result
+
+
+def read_binary(filename, chunk_size=1 << 20):
+    """Generator of record chunks from a binary trace file of packed records"""
+    with open(filename, 'rb') as file:
+        while True:
+            chunk = numpy.fromfile(file, dtype=record, count=chunk_size)
+            if len(chunk) == 0:
+                break
+            yield chunk
+
+
+class Replay(object):
+    """Shadow register state of a device, initialized with reset values"""
+
+    def __init__(self, device):
+        self.index = AddressIndex.get(device)
+        self.shadow = self.index.resetValues.copy()
+        self.unresolved = 0
+
+    def process(self, chunk):
+        """Apply chunk to shadow state and return list of events in trace order.
+
+        Reads update the shadow state silently, writes which change the shadow state generate events.
+        """
+        indices = self.index.resolve(chunk['address'])
+        resolved = indices >= 0
+        self.unresolved += int(len(indices) - numpy.count_nonzero(resolved))
+
+        positions = numpy.nonzero(resolved)[0]
+        registers = indices[positions]
+        values = chunk['value'][positions]
+
+        # Group accesses per register keeping trace order, previous value is previous access or shadow state
+        order = numpy.argsort(registers, kind='stable')
+        registers = registers[order]
+        values = values[order]
+        first = numpy.ones(len(registers), dtype=bool)
+        last = numpy.ones(len(registers), dtype=bool)
+        first[1:] = registers[1:] != registers[:-1]
+        last[:-1] = first[1:]
+
+        previous = numpy.empty_like(values)
+        previous[1:] = values[:-1]
+        previous[first] = self.shadow[registers[first]]
+        self.shadow[registers[last]] = values[last]
+
+        changed = numpy.nonzero((values != previous) & (chunk['write'][positions][order] != 0))[0]
+        changed = changed[numpy.argsort(order[changed], kind='stable')]
+
+        events = []
+        timestamps = chunk['timestamp'][positions][order]
+        paths = self.index.paths
+        fields = self.index.fields
+        for (timestamp, register, old, new) in zip(timestamps[changed].tolist(), registers[changed].tolist(),
+                                                   previous[changed].tolist(), values[changed].tolist()):
+            if not fields[register]:
+                events.append(Event(timestamp, paths[register], None, old, new))
+                continue
+            for (name, bitOffset, mask) in fields[register]:
+                old_value = (old >> bitOffset) & mask
+                new_value = (new >> bitOffset) & mask
+                if old_value != new_value:
+                    events.append(Event(timestamp, paths[register], name, old_value, new_value))
+        return events
+
+    def events(self, chunks):
+        """Generator of events of all chunks"""
+        for chunk in chunks:
+            yield from self.process(chunk)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# coding: utf-8
+"""pysvd benchmark.
+
+Render the peripherals of a synthetically scaled SVD file with the formatting functions of svd2rst and svd2register and compare them
+against the same functions of a git revision before the compiled templates, e.g. the parent of the commit introducing them.
+"""
+
+import io
+import os
+import time
+import copy
+import types
+import argparse
+import subprocess
+import xml.etree.ElementTree as ET
+import pysvd
+
+from scripts import svd2rst
+from scripts import svd2register
+
+
+def scale(node, count):
+    """Append count - 1 renamed copies of all peripherals with shifted base addresses"""
+    peripherals = node.find('peripherals')
+    originals = list(peripherals)
+    for index in range(1, count):
+        for original in originals:
+            peripheral = copy.deepcopy(original)
+            peripheral.find('name').text += '_{}'.format(index)
+            if 'derivedFrom' in peripheral.attrib:
+                peripheral.attrib['derivedFrom'] += '_{}'.format(index)
+            address = peripheral.find('baseAddress')
+            address.text = hex(pysvd.parser.Integer(address.text) + index * 0x100000)
+            for interrupt in peripheral.findall('interrupt'):
+                interrupt.find('name').text += '_{}'.format(index)
+            peripherals.append(peripheral)
+    return node
+
+
+def measure(function, repeat):
+    """Get best time of function in seconds and its result"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return (best, result)
+
+
+def baseline(revision, name):
+    """Load script module scripts/<name>.py of git revision"""
+    path = 'scripts/{}.py'.format(name)
+    text = subprocess.check_output(['git', 'show', '{}:{}'.format(revision, path)], cwd=os.path.dirname(os.path.dirname(__file__)) or '.')
+    module = types.ModuleType('{}_{}'.format(name, revision))
+    exec(compile(text, '{}:{}'.format(revision, path), 'exec'), module.__dict__)
+    return module
+
+
+def render_rst(module, device):
+    """Get text of all peripherals formatted by svd2rst module"""
+    output = io.StringIO()
+    for peripheral in device.peripherals:
+        module.format_peripheral(output, peripheral)
+    return output.getvalue()
+
+
+def render_register(module, device):
+    """Get structs of all peripherals defining a struct type written by svd2register module"""
+    output = io.StringIO()
+    cache = {}
+    (names, structs) = svd2register.struct_types(device)
+    for (prefix, peripheral) in structs:
+        module.write_struct(output, prefix, peripheral, names[id(peripheral)], cache)
+    return output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark template rendering of generators')
+    parser.add_argument('--svd', metavar='FILE', type=str, help='System view description (SVD) file', default='res/cortex-m3.svd')
+    parser.add_argument('--baseline', '-b', metavar='REV', type=str, help='Git revision of the scripts to compare with', required=True)
+    parser.add_argument('--scale', '-s', metavar='N', type=int, help='Number of copies of each peripheral', default=50)
+    parser.add_argument('--repeat', '-r', metavar='N', type=int, help='Number of repetitions, best time is reported', default=5)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    node = scale(ET.parse(args.svd).getroot(), args.scale)
+    device = pysvd.element.Device(node)
+    print("Parsed {} peripherals in {:.3f} s".format(len(device.peripherals), time.perf_counter() - start))
+
+    for (name, module, render) in (('svd2rst', svd2rst, render_rst), ('svd2register', svd2register, render_register)):
+        previous = baseline(args.baseline, name)
+        (before, expected) = measure(lambda: render(previous, device), args.repeat)
+        (after, result) = measure(lambda: render(module, device), args.repeat)
+        if result != expected:
+            raise ValueError("Output of {} differs from revision {}".format(name, args.baseline))
+        print("{}: {} {:.3f} s, compiled templates {:.3f} s, speedup {:.2f}".format(name, args.baseline, before, after, before / after))
+
+
+if __name__ == '__main__':
+    main()
@@ -5,129 +5,207 @@
 Read SVD file and generate C-style register access structs.
 """
 
+import io
 import argparse
 import xml.etree.ElementTree as ET
 import pysvd
-from enum import Enum
 
 access = {
     pysvd.type.access.read_write: '__IO',
     pysvd.type.access.read_only: '__I',
     pysvd.type.access.write_only: '__O',
+    pysvd.type.access.writeOnce: '__O',
+    pysvd.type.access.read_writeOnce: '__IO',
 }
 
 data_type = {
     8: 'uint8_t',
     16: 'uint16_t',
     32: 'uint32_t',
+    64: 'uint64_t',
 }
 
-def format_registers(output, prefix, registers):
-    data = []
-    for register in registers:
-        data.append(('`{1} <{0}.{1}_>`_'.format(prefix, register.name), '0x{:02X}'.format(register.addressOffset)))
-    if len(data):
-        output.write(table(('Register', 'Offset'), data))
+# Default templates, name -> (text, fields)
+templates = pysvd.template.Templates({
+    'header': ("/**\n * @file\n * @version {version}\n * @brief Register access structs for {vendor} {name}\n"
+               " * @note This file is autogenerated using pysvd {pysvd}\n */\n\n"
+               "#pragma once\n\n#include <stdint.h>\n#include <assert.h>\n\n"
+               "#define __I volatile const /*!< Read only permission */\n#define __O volatile  /*!< Write only permission */\n"
+               "#define __IO volatile /*!< Read/write permission */\n\n", ('version', 'vendor', 'name', 'pysvd')),
+    'interrupts': ("typedef enum\n{{\n{interrupts}}} IRQn_Type;\n\n", ('interrupts', )),
+    'interrupt': ("    {enumerator:30}= {value},\n", ('enumerator', 'name', 'value')),
+    'peripheral': ("/* {name} - {description} */\n\n", ('name', 'description')),
+    'struct': ("typedef struct\n{{\n{members}}} {type};\nstatic_assert(sizeof({type}) == 0x{size:X}, \"Size of {type} mismatch\");\n\n",
+               ('type', 'size', 'members')),
+    'union': ("{indent}union\n{indent}{{\n{members}{indent}}};\n", ('indent', 'members')),
+    'unionStruct': ("{indent}struct\n{indent}{{\n{members}{indent}}};\n", ('indent', 'members')),
+    'register': ("{indent}{access:4} {type} {name}{dimension}; /*!< Offset: 0x{offset:03X} {description} */\n",
+                 ('indent', 'access', 'type', 'name', 'dimension', 'offset', 'description')),
+    'cluster': ("{indent}{type} {name}{dimension}; /*!< Offset: 0x{offset:03X} {description} */\n",
+                ('indent', 'type', 'name', 'dimension', 'offset', 'description')),
+    'reserved': ("{indent}__I  {type} RESERVED{index}[{count}];\n", ('indent', 'type', 'index', 'count')),
+    'field': ("#define {macro}_Pos {offset}\n#define {macro}_Msk (0x{mask:X}UL << {macro}_Pos)\n",
+              ('macro', 'prefix', 'register', 'name', 'offset', 'width', 'mask')),
+    'fields': ("{fields}\n", ('fields', )),
+    'base': ("#define {name}_BASE 0x{address:08X}UL\n", ('name', 'address', 'type')),
+    'instance': ("#define {name} (({type} *) {name}_BASE)\n", ('name', 'address', 'type')),
+    'instances': ("{bases}\n{instances}", ('bases', 'instances')),
+})
+
+
+def reserved(offset, size, index, indent='    '):
+    """Get declaration of reserved padding with widest type matching offset and size"""
+    for width in (4, 2, 1):
+        if offset % width == 0 and size % width == 0:
+            return templates['reserved'](indent, data_type[width * 8], index, size // width)
+
+
+def declaration(member, types, indent='    '):
+    """Get declaration of a member"""
+    element = member.element
+    dimension = '[{}]'.format(member.count) if pysvd.layout.array_name(element) is not None else ''
+    description = ' '.join(getattr(element, 'description', '').split())
+    if isinstance(element, pysvd.element.Register):
+        if element.size not in data_type:
+            raise ValueError("Register '{}' has unsupported size {}".format(element.name, element.size))
+        return templates['register'](indent, access[getattr(element, 'access', pysvd.type.access.read_write)], data_type[element.size],
+                                     member.name, dimension, member.offset, description)
+    return templates['cluster'](indent, types[id(pysvd.layout.layout(element))], member.name, dimension, member.offset, description)
+
+
+def write_struct(output, prefix, container, type_name, cache, types=None):
+    """Write typedef of a peripheral or cluster struct and its bit-field macros. Nested cluster structs are written before, clusters
+    with equal layout share their type (types maps layouts to type names)."""
+    if types is None:
+        types = {}
+    for cluster in container.clusters:
+        result = pysvd.layout.layout(cluster, cache)
+        if id(result) not in types:
+            name = '{}_{}'.format(prefix, pysvd.layout.array_name(cluster) or pysvd.layout.identifier(cluster.name))
+            types[id(result)] = getattr(cluster, 'headerStructName', name + '_Type')
+            write_struct(output, name, cluster, types[id(result)], cache, types)
+
+    result = pysvd.layout.layout(container, cache)
+    lines = []
+    padding = 0
+    for entry in result.entries:
+        if isinstance(entry, pysvd.layout.Member):
+            lines.append(declaration(entry, types))
+        elif isinstance(entry, pysvd.layout.Reserved):
+            lines.append(reserved(entry.offset, entry.size, padding))
+            padding += 1
+        else:
+            # Union of overlapping members, members with higher offset are wrapped into a struct with leading padding
+            members = []
+            for member in entry.members:
+                if member.offset == entry.offset:
+                    members.append(declaration(member, types, '        '))
+                else:
+                    members.append(templates['unionStruct']('        ', reserved(entry.offset, member.offset - entry.offset, padding,
+                                                                                  '            ') +
+                                                            declaration(member, types, '            ')))
+                    padding += 1
+            lines.append(templates['union']('    ', ''.join(members)))
+    output.write(templates['struct'](type_name, result.size, ''.join(lines)))
+
+    # Bit-field position and mask macros, once per register array
+    macros = []
+    seen = set()
+    for register in container.registers:
+        if id(register.node) in seen:
+            continue
+        if pysvd.layout.array_name(register) is not None:
+            seen.add(id(register.node))
+        name = pysvd.layout.array_name(register) or pysvd.layout.identifier(register.name)
+        for field in register.fields:
+            field_name = pysvd.layout.identifier(field.name)
+            macros.append(('{}_{}_{}'.format(prefix, name, field_name), prefix, name, field_name, field.bitOffset, field.bitWidth,
+                           (1 << field.bitWidth) - 1))
+    if macros:
+        output.write(templates['fields'](templates['field'].join(macros)))
+
+
+def render(prefix, peripheral, type_name, cache):
+    """Get struct and bit-field macros of a peripheral"""
+    output = io.StringIO()
+    output.write(templates['peripheral'](peripheral.name, ' '.join(getattr(peripheral, 'description', '').split())))
+    write_struct(output, prefix, peripheral, type_name, cache)
+    return output.getvalue()
+
+
+def struct_types(device):
+    """Get struct type name of each peripheral (by id) and the (prefix, peripheral) pairs defining the struct types. Derived
+    peripherals with equal registers and elements of peripheral arrays reuse the struct type."""
+    types = {}
+    structs = []
+    first = {}
+    for peripheral in device.peripherals:
+        first.setdefault(id(peripheral.node), peripheral)
+    for peripheral in device.peripherals:
+        base = peripheral.derivedFrom
+        if base is None or base.digest_struct() != peripheral.digest_struct():
+            base = first[id(peripheral.node)]
+        if base is not peripheral:
+            types[id(peripheral)] = types[id(base)]
+        else:
+            prefix = pysvd.layout.array_name(peripheral) or pysvd.layout.identifier(peripheral.name)
+            types[id(peripheral)] = getattr(peripheral, 'headerStructName', prefix) + '_Type'
+            structs.append((prefix, peripheral))
+    return (types, structs)
+
+
+def convert(svd, target, args):
+    """Convert SVD file into C header file"""
+    node = ET.parse(svd).getroot()
+    device = pysvd.element.Device(node)
 
-    for register in registers:
-        output.write('.. _{}.{}:\n\n'.format(prefix, register.name))
+    # With manifest unchanged peripherals (with unchanged templates) are not rendered again
+    manifest = pysvd.manifest.load(pysvd.batch.output_name(args.manifest, svd) if args.manifest else None,
+                                   [peripheral.name for peripheral in device.peripherals], args.force)
+    template_digest = templates.digest()
 
-        output.write(underline(register.description, section.subsubsection))
+    # Stream into buffered output, file is only replaced if changed
+    with pysvd.output.Writer(target) as output:
+        output.write(templates['header'](device.version, getattr(device, 'vendor', ''), device.name, pysvd.__version__))
 
-        output.write(rst_list_name.format('Name', register.name))
-        output.write(rst_list_name.format('Size', register.size))
-        output.write(rst_list_name.format('Offset', '0x{:02X}'.format(register.addressOffset)))
-        output.write(rst_list_name.format('Reset', '0x{:{fill}{width}X}'.format(register.resetValue, fill='0', width=register.size // 4)))
-        output.write(rst_list_name.format('Access', register.access))
-        output.write('\n')
+        # Core exceptions (negative CMSIS numbers) and interrupts, enumerators need unique names
+        data = [(exception.name + '_IRQn', exception.name, exception.number - 16) for exception in device.interrupts.exceptions]
+        for interrupt in device.interrupts.unique():
+            name = pysvd.layout.identifier(interrupt.name)
+            data.append((name + '_IRQn', name, interrupt.value))
+        output.write(templates['interrupts'](templates['interrupt'].join(data)))
 
-        # Table
+        # Peripherals
+        (types, structs) = struct_types(device)
+        cache = {}
+        for (prefix, peripheral) in structs:
+            digest = pysvd.manifest.fingerprint(peripheral, template_digest)
+            output.write(manifest.fragment(peripheral.name, digest, lambda: render(prefix, peripheral, types[id(peripheral)], cache)))
+
+        # Instances
+        instances = [(pysvd.layout.identifier(peripheral.name), peripheral.baseAddress, types[id(peripheral)])
+                     for peripheral in device.peripherals]
+        output.write(templates['instances'](templates['base'].join(instances), templates['instance'].join(instances)))
+
+    manifest.save()
 
-        # Bit description
-        for field in register.fields:
-            if field.bitWidth == 1:
-                output.write('- Bit {} ({}) - {}\n'.format(field.bitOffset, field.access, field.name))
-            else:
-                output.write('- Bits {}:{} ({}) - {}\n'.format(
-                    field.bitOffset + field.bitWidth - 1, field.bitOffset, field.access, field.name))
-            output.write('   {}\n\n'.format(field.description))
-
-            if hasattr(field, 'enumeratedValues'):
-                for enumeratedValue in field.enumeratedValues.enumeratedValues:
-                    output.write('   - {} - {}\n'.format(enumeratedValue.value, enumeratedValue.name))
-                    if hasattr(enumeratedValue, 'description'):
-                        output.write('      {}\n'.format(enumeratedValue.description))
-                output.write('\n')
-
-
-def write_register(register, output):
-    output.write("    union\n    {\n")
-    output.write("    {1} {2} {0.name};\n".format(register, access[register.access], data_type[register.size]))
-
-
-def write_peripheral(peripheral, output):
-    output.write("/* {0.name} - {0.description} */\n\n".format(peripheral))
-
-    index = 1;
-    offset = 0
-    output.write("struct __attribute__((packed))  {0.name}_t\n{{\n".format(peripheral))
-    for register in peripheral.registers:
-        if register.addressOffset != offset:
-            output.write("    __I {0} _{1};\n".format(data_type[register.addressOffset - offset]), index)
-            index += 1
-        write_register(register, output)
-        offset = register.addressOffset + register.size // 8
-    output.write("};\n")
-    output.write("static_assert(sizeof({0}_t) == {1}, \"Size of {0}_t mismatch\");\n\n".format(peripheral.name, offset))
 
 def main():
     parser = argparse.ArgumentParser(description='SVD to C-style register access structs')
-    parser.add_argument('--svd', metavar='FILE', type=str, help='System view description (SVD) file', required=True)
-    parser.add_argument('--output', '-o',  metavar='FILE', type=str, help='C output file', required=True)
+    parser.add_argument('--svd', metavar='FILE', type=str, nargs='+', help='System view description (SVD) files or directories',
+                        required=True)
+    parser.add_argument('--output', '-o',  metavar='FILE', type=str, help='C output file, template with {name} of SVD file for batches',
+                        required=True)
+    parser.add_argument('--manifest', metavar='FILE', type=str,
+                        help='Manifest of rendered peripherals to regenerate only changed ones, template with {name} for batches')
+    parser.add_argument('--jobs', '-j', metavar='N', type=int, help='Number of processes to convert files (default: number of CPUs)')
+    parser.add_argument('--force', action='store_true', help='Render all peripherals, even if unchanged in manifest')
+    parser.add_argument('--templates', metavar='DIR', type=str, help='Directory with templates <name>.tmpl overriding the defaults')
     parser.add_argument('--version', action='version', version=pysvd.__version__)
     args = parser.parse_args()
 
-    node = ET.parse(args.svd).getroot()
-    device = pysvd.element.Device(node)
+    pysvd.batch.main(parser, args, convert, __name__)
 
-    output = open(args.output, "w")
-
-    # Header
-    output.write("/**\n" \
-        " * @file\n" \
-        " * @version {0.version}\n" \
-        " * @brief Register access structs for {0.vendor} {0.name}\n" \
-        " * @note This file is autogenerated using pysvd {1.__version__}\n" \
-        " */\n\n".format(device, pysvd)
-    )
-    output.write("#pragma once\n\n")
-
-    output.write("#define __I volatile const /*!< Read only permission */\n" \
-        "#define __O volatile  /*!< Write only permission */\n" \
-        "#define __IO volatile /*!< Read/write permission */\n\n"
-    )
-
-    # Interrupts
-    interrupts = []
-    for peripheral in device.peripherals:
-        interrupts += peripheral.interrupts
-
-    interrupt_count = 0
-    interrupt_name = ""
-    output.write("enum IRQn\n{\n")
-    for interrupt in sorted(interrupts, key=lambda interrupt: interrupt.value):
-        if interrupt_name != interrupt.name:
-            output.write("    {0.name:20}= {0.value},\n".format(interrupt))
-            interrupt_name = interrupt.name
-            interrupt_count += 1
-    output.write("};\n\n")
-
-    # Peripherals
-    data = []
-    for peripheral in sorted(device.peripherals, key=lambda peripheral: peripheral.name):
-        if peripheral.name.startswith('ADC'):
-            write_peripheral(peripheral, output)
-    output.close()
 
 if __name__ == '__main__':
     main()
@@ -5,12 +5,28 @@
 Read SVD file and generate device datasheet in rst format.
 """
 
+import io
+import os
 import argparse
+import concurrent.futures
 import xml.etree.ElementTree as ET
 import pysvd
 from enum import Enum
 
-rst_list_name = ":{}: {}\n"
+# Default templates, name -> (text, fields)
+templates = pysvd.template.Templates({
+    'item': (":{name}: {value}\n", ('name', 'value')),
+    'title': ("{title}\n{line}\n\n", ('title', 'line')),
+    'peripheral': (".. _{name}:\n\n{title}\n{line}\n\n", ('name', 'description', 'title', 'line')),
+    'cluster': (".. _{prefix}.{name}:\n\n{title}\n{line}\n\n", ('prefix', 'name', 'description', 'title', 'line')),
+    'register': (".. _{prefix}.{name}:\n\n{description}\n{line}\n\n:Name: {name}\n:Size: {size}\n:Offset: 0x{offset:02X}\n"
+                 ":Reset: 0x{resetValue:0{digits}X}\n:Access: {access}\n\n",
+                 ('prefix', 'name', 'description', 'line', 'size', 'offset', 'resetValue', 'digits', 'access')),
+    'field': ("- {bits} ({access}) - {name}\n   {description}\n\n", ('name', 'bits', 'msb', 'lsb', 'access', 'description')),
+    'enumeratedValue': ("   - {value} - {name}\n{description}", ('value', 'name', 'description')),
+    'enumeratedValueDescription': ("      {description}\n", ('description', )),
+    'footer': ("Autogenerated ReST with pysvd {version}\n", ('version', )),
+})
 
 
 class section(Enum):
@@ -24,7 +40,7 @@ class section(Enum):
 
 
 def underline(value, section):
-    return "{}\n{}\n\n".format(value, str(section) * len(value))
+    return templates['title'](value, str(section) * len(value))
 
 
 def table(header, data):
@@ -35,185 +51,240 @@ def table(header, data):
         raise ValueError("columns in header and data do not match")
 
     # Find width of column
-    widths = []
-    for caption in header:
-        widths.append(len(caption))
+    widths = [max(map(len, column)) for column in zip(header, *data)]
 
-    for row in data:
-        index = 0
-        for text in row:
-            widths[index] = max(widths[index], len(text))
-            index += 1
+    separator = ' '.join('=' * width for width in widths) + '\n'
+    lines = [separator, ' '.join('{:^{}}'.format(caption, width) for (caption, width) in zip(header, widths)).rstrip() + '\n', separator]
+    lines += [' '.join(text.ljust(width) for (text, width) in zip(row, widths)).rstrip() + '\n' for row in data]
+    lines += [separator, '\n']
 
-    result = ''
-    separator = []
-    line = []
-
-    index = 0
-    for caption in header:
-        separator.append('=' * widths[index])
-        line.append('{:{align}{width}}'.format(caption, align='^', width=widths[index]))
-        index += 1
-
-    result = ' '.join(separator) + '\n'
-    result += ' '.join(line).rstrip() + '\n'
-    result += ' '.join(separator) + '\n'
-
-    for row in data:
-        index = 0
-        for text in row:
-            line[index] = '{:{width}}'.format(text, width=widths[index])
-            index += 1
-        result += ' '.join(line).rstrip() + '\n'
-    result += ' '.join(separator) + '\n'
-
-    return result + '\n'
+    return ''.join(lines)
 
 
 def format_registers(output, prefix, registers):
+    result = []
     data = []
     for register in registers:
         data.append(('`{1} <{0}.{1}_>`_'.format(prefix, register.name), '0x{:02X}'.format(register.addressOffset)))
     if len(data):
-        output.write(table(('Register', 'Offset'), data))
+        result.append(table(('Register', 'Offset'), data))
 
+    render_register = templates['register'].render
+    render_field = templates['field'].render
+    render_value = templates['enumeratedValue'].render
+    render_description = templates['enumeratedValueDescription'].render
     for register in registers:
-        output.write('.. _{}.{}:\n\n'.format(prefix, register.name))
-
-        output.write(underline(register.description, section.subsubsection))
-
-        output.write(rst_list_name.format('Name', register.name))
-        output.write(rst_list_name.format('Size', register.size))
-        output.write(rst_list_name.format('Offset', '0x{:02X}'.format(register.addressOffset)))
-        output.write(rst_list_name.format('Reset', '0x{:{fill}{width}X}'.format(register.resetValue, fill='0', width=register.size // 4)))
-        output.write(rst_list_name.format('Access', register.access))
-        output.write('\n')
-
-        # Table
+        description = register.description
+        result.append(render_register((prefix, register.name, description, str(section.subsubsection) * len(description), register.size,
+                                       register.addressOffset, register.resetValue, register.size // 4, register.access)))
 
         # Bit description
         for field in register.fields:
-            if field.bitWidth == 1:
-                output.write('- Bit {} ({}) - {}\n'.format(field.bitOffset, field.access, field.name))
-            else:
-                output.write('- Bits {}:{} ({}) - {}\n'.format(
-                    field.bitOffset + field.bitWidth - 1, field.bitOffset, field.access, field.name))
-            output.write('   {}\n\n'.format(field.description))
+            msb = field.bitOffset + field.bitWidth - 1
+            bits = 'Bit {}'.format(msb) if field.bitWidth == 1 else 'Bits {}:{}'.format(msb, field.bitOffset)
+            result.append(render_field((field.name, bits, msb, field.bitOffset, field.access, field.description)))
 
             if hasattr(field, 'enumeratedValues'):
                 for enumeratedValue in field.enumeratedValues.enumeratedValues:
-                    output.write('   - {} - {}\n'.format(enumeratedValue.value, enumeratedValue.name))
-                    if hasattr(enumeratedValue, 'description'):
-                        output.write('      {}\n'.format(enumeratedValue.description))
-                output.write('\n')
+                    description = getattr(enumeratedValue, 'description', None)
+                    description = render_description((description, )) if description is not None else ''
+                    result.append(render_value((enumeratedValue.value, enumeratedValue.name, description)))
+                result.append('\n')
 
+    output.write(''.join(result))
 
-def main():
-    parser = argparse.ArgumentParser(description='SVD to ReST converter')
-    parser.add_argument('--svd', metavar='FILE', type=str, help='System view description (SVD) file', required=True)
-    parser.add_argument('--output', '-o',  metavar='FILE', type=str, help='ReST output file', required=True)
-    parser.add_argument('--version', action='version', version=pysvd.__version__)
-    args = parser.parse_args()
 
-    node = ET.parse(args.svd).getroot()
-    device = pysvd.element.Device(node)
-
-    output = open(args.output, "w")
+def format_device(output, device):
+    data = []
 
     # Device
-    output.write(underline('Device', section.section))
-
-    output.write(rst_list_name.format('Name', device.name))
-    output.write(rst_list_name.format('Description', device.description))
+    data.append(('Name', device.name))
+    data.append(('Description', device.description))
     if hasattr(device, 'series'):
-        output.write(rst_list_name.format('Series', device.series))
-    output.write(rst_list_name.format('Version', device.version))
+        data.append(('Series', device.series))
+    data.append(('Version', device.version))
     if hasattr(device, 'vendor'):
-        output.write(rst_list_name.format('Vendor', device.vendor))
-    output.write('\n')
+        data.append(('Vendor', device.vendor))
+    output.write(underline('Device', section.section) + templates['item'].join(data) + '\n')
 
-    output.write(rst_list_name.format('Address unit bits', device.addressUnitBits))
-    output.write(rst_list_name.format('Data width', device.width))
-    output.write('\n')
+    data = [('Address unit bits', device.addressUnitBits), ('Data width', device.width)]
+    output.write(templates['item'].join(data) + '\n')
 
     # CPU
-    output.write(underline('CPU', section.section))
-
     cpu = device.cpu
-    output.write(rst_list_name.format('Name', str(cpu.name).replace('CM', 'Cortex-M').replace('CA', 'Cortex-A').replace('PLUS', '+')))
-    output.write(rst_list_name.format('Revision', cpu.revision))
-    output.write(rst_list_name.format('Endian', cpu.endian))
-    output.write(rst_list_name.format('MPU', 'yes' if cpu.mpuPresent else 'no'))
-    output.write(rst_list_name.format('FPU', 'yes' if cpu.fpuPresent else 'no'))
-    if hasattr(cpu, 'fpuDP'):
-        output.write(rst_list_name.format('FPU DP', 'yes' if cpu.fpuDP else 'no'))
-    if hasattr(cpu, 'icachePresent'):
-        output.write(rst_list_name.format('I-Cache', 'yes' if cpu.icachePresent else 'no'))
-    if hasattr(cpu, 'dcachePresent'):
-        output.write(rst_list_name.format('D-Cache', 'yes' if cpu.dcachePresent else 'no'))
-    if hasattr(cpu, 'itcmPresent'):
-        output.write(rst_list_name.format('ITCM', 'yes' if cpu.itcmPresent else 'no'))
-    if hasattr(cpu, 'dtcmPresent'):
-        output.write(rst_list_name.format('DTCM', 'yes' if cpu.dtcmPresent else 'no'))
-    output.write(rst_list_name.format('VTOR', 'yes' if cpu.vtorPresent else 'no'))
+    data = []
+    data.append(('Name', str(cpu.name).replace('CM', 'Cortex-M').replace('CA', 'Cortex-A').replace('PLUS', '+')))
+    data.append(('Revision', cpu.revision))
+    data.append(('Endian', cpu.endian))
+    data.append(('MPU', 'yes' if cpu.mpuPresent else 'no'))
+    data.append(('FPU', 'yes' if cpu.fpuPresent else 'no'))
+    for (name, attribute) in (('FPU DP', 'fpuDP'), ('I-Cache', 'icachePresent'), ('D-Cache', 'dcachePresent'), ('ITCM', 'itcmPresent'),
+                              ('DTCM', 'dtcmPresent')):
+        if hasattr(cpu, attribute):
+            data.append((name, 'yes' if getattr(cpu, attribute) else 'no'))
+    data.append(('VTOR', 'yes' if cpu.vtorPresent else 'no'))
     if hasattr(cpu, 'deviceNumInterrupts'):
-        output.write(rst_list_name.format('Interrupts', cpu.deviceNumInterrupts))
-    output.write(rst_list_name.format('Interrupt priorities', 2 ** cpu.nvicPrioBits))
-    output.write(rst_list_name.format('Vendor SYSTICK', 'yes' if cpu.vendorSystickConfig else 'no'))
-    output.write('\n')
+        data.append(('Interrupts', cpu.deviceNumInterrupts))
+    data.append(('Interrupt priorities', 2 ** cpu.nvicPrioBits))
+    data.append(('Vendor SYSTICK', 'yes' if cpu.vendorSystickConfig else 'no'))
+    output.write(underline('CPU', section.section) + templates['item'].join(data) + '\n')
+
+
+def link(text, target):
+    """Hyperlink to target inside of the same document"""
+    return '{}_'.format(text) if text == target else '`{} <{}_>`_'.format(text, target)
+
+
+def ref(text, target):
+    """Sphinx cross reference to target in any document"""
+    return ':ref:`{}`'.format(text) if text == target else ':ref:`{} <{}>`'.format(text, target)
 
+
+def format_mapping(output, device, reference=link):
     # Memory mapping
     output.write(underline('Memory mapping', section.section))
 
     data = []
     for peripheral in sorted(device.peripherals, key=lambda peripheral: peripheral.baseAddress):
-        data.append(('{}_'.format(peripheral.name), '0x{:08X}'.format(peripheral.baseAddress)))
+        data.append((reference(peripheral.name, peripheral.name), '0x{:08X}'.format(peripheral.baseAddress)))
     output.write(table(('Peripheral', 'Address'), data))
 
     # Interrupt mapping
     output.write(underline('Interrupt mapping', section.section))
 
     data = []
-    interrupts = []
-    for peripheral in device.peripherals:
-        interrupts += peripheral.interrupts
-
-    for interrupt in sorted(interrupts, key=lambda interrupt: interrupt.value):
-        data.append(('`{0}.{1} <{0}_>`_'.format(interrupt.parent.name, interrupt.name), str(interrupt.value)))
+    for interrupt in device.interrupts:
+        for peripheral in device.interrupts.peripherals[(interrupt.name, interrupt.value)]:
+            data.append((reference('{}.{}'.format(peripheral.name, interrupt.name), peripheral.name), str(interrupt.value)))
     output.write(table(('Peripheral', 'Interrupt'), data))
 
-    # Peripheral
-    output.write(underline('Peripheral', section.section))
 
-    for peripheral in device.peripherals:
-        output.write('.. _{}:\n\n'.format(peripheral.name))
+def format_peripheral(output, peripheral):
+    title = '{} ({})'.format(peripheral.description, peripheral.name)
+    output.write(templates['peripheral'](peripheral.name, peripheral.description, title, str(section.subsection) * len(title)))
+
+    data = []
+    if hasattr(peripheral, 'version'):
+        data.append(('Version', peripheral.version))
+    data.append(('Address', '0x{:08X}'.format(peripheral.baseAddress)))
+    for interrupt in peripheral.interrupts:
+        data.append(('Interrupt {}'.format(interrupt.name), interrupt.value))
+    output.write(templates['item'].join(data) + '\n')
+
+    data = []
+    for cluster in peripheral.clusters:
+        data.append(('`{1} <{0}.{1}_>`_'.format(peripheral.name, cluster.name), '0x{:02X}'.format(cluster.addressOffset)))
+    if len(data):
+        output.write(table(('Cluster', 'Offset'), data))
+
+    format_registers(output, peripheral.name, peripheral.registers)
+
+    for cluster in peripheral.clusters:
+        title = '{} ({})'.format(cluster.description, cluster.name)
+        output.write(templates['cluster'](peripheral.name, cluster.name, cluster.description, title,
+                                          str(section.subsubsection) * len(title)))
+
+        format_registers(output, '{}.{}'.format(peripheral.name, cluster.name), cluster.registers)
+
 
-        output.write(underline('{} ({})'.format(peripheral.description, peripheral.name), section.subsection))
+# Device of worker process, parsed once by init_worker()
+worker_device = None
 
-        if hasattr(peripheral, 'version'):
-            output.write(rst_list_name.format('Version', peripheral.version))
-        output.write(rst_list_name.format('Address', '0x{:08X}'.format(peripheral.baseAddress)))
-        for interrupt in peripheral.interrupts:
-            output.write(rst_list_name.format('Interrupt {}'.format(interrupt.name), interrupt.value))
-        output.write("\n")
 
-        data = []
-        for cluster in peripheral.clusters:
-            data.append(('`{1} <{0}.{1}_>`_'.format(peripheral.name, cluster.name), '0x{:02X}'.format(cluster.addressOffset)))
-        if len(data):
-            output.write(table(('Cluster', 'Offset'), data))
+def init_worker(filename, directory):
+    global worker_device
+    worker_device = pysvd.element.Device(ET.parse(filename).getroot())
+    pysvd.batch.load_templates(__name__, directory)
 
-        format_registers(output, peripheral.name, peripheral.registers)
 
-        for cluster in peripheral.clusters:
-            output.write('.. _{}.{}:\n\n'.format(peripheral.name, cluster.name))
+def render_peripheral(index):
+    """Render peripheral of worker device into standalone document"""
+    output = io.StringIO()
+    format_peripheral(output, worker_device.peripherals[index])
+    output.write(templates['footer'](pysvd.__version__))
+    return output.getvalue()
 
-            output.write(underline('{} ({})'.format(cluster.description, cluster.name), section.subsubsection))
 
-            format_registers(output, '{}.{}'.format(peripheral.name, cluster.name), cluster.registers)
+def render(function, *arguments):
+    """Get text written by function(output, *arguments)"""
+    output = io.StringIO()
+    function(output, *arguments)
+    return output.getvalue()
+
+
+def convert(svd, target, args):
+    """Convert SVD file into ReST output file"""
+    node = ET.parse(svd).getroot()
+    device = pysvd.element.Device(node)
+
+    # With manifest unchanged peripherals (with unchanged templates) are neither rendered nor written
+    manifest = pysvd.manifest.load(pysvd.batch.output_name(args.manifest, svd) if args.manifest else None,
+                                   [peripheral.name for peripheral in device.peripherals], args.force)
+    template_digest = templates.digest()
+
+    # Stream into buffered output, file is only replaced if changed
+    with pysvd.output.Writer(target) as output:
+        format_device(output, device)
+        format_mapping(output, device, ref if args.split else link)
+
+        # Peripheral
+        output.write(underline('Peripheral', section.section))
+
+        if args.split:
+            # Pages go into a directory named like the output file, so devices of a batch do not overwrite each other's pages
+            folder = os.path.splitext(os.path.basename(target))[0]
+            directory = os.path.join(os.path.dirname(target), folder)
+            os.makedirs(directory, exist_ok=True)
+            output.write('.. toctree::\n   :maxdepth: 1\n\n')
+            output.write(''.join('   {}/{}\n'.format(folder, peripheral.name) for peripheral in device.peripherals))
+            output.write('\n')
+
+            pending = []
+            for (index, peripheral) in enumerate(device.peripherals):
+                filename = os.path.join(directory, peripheral.name + '.rst')
+                digest = pysvd.manifest.fingerprint(peripheral, 'split', filename, template_digest)
+                if manifest.get(peripheral.name, digest) is None:
+                    pending.append((index, peripheral.name, digest, filename))
+
+            if pending and args.jobs == 1:
+                init_worker(svd, args.templates)
+                for (index, name, digest, filename) in pending:
+                    pysvd.output.write(filename, render_peripheral(index))
+                    manifest.set(name, digest, file=filename)
+            elif pending:
+                initargs = (svd, args.templates)
+                with concurrent.futures.ProcessPoolExecutor(args.jobs, initializer=init_worker, initargs=initargs) as executor:
+                    texts = executor.map(render_peripheral, [item[0] for item in pending])
+                    for ((index, name, digest, filename), text) in zip(pending, texts):
+                        pysvd.output.write(filename, text)
+                        manifest.set(name, digest, file=filename)
+        else:
+            for peripheral in device.peripherals:
+                digest = pysvd.manifest.fingerprint(peripheral, template_digest)
+                output.write(manifest.fragment(peripheral.name, digest, lambda: render(format_peripheral, peripheral)))
+
+        output.write(templates['footer'](pysvd.__version__))
+    manifest.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SVD to ReST converter')
+    parser.add_argument('--svd', metavar='FILE', type=str, nargs='+', help='System view description (SVD) files or directories',
+                        required=True)
+    parser.add_argument('--output', '-o',  metavar='FILE', type=str, help='ReST output file, template with {name} of SVD file for batches',
+                        required=True)
+    parser.add_argument('--split', action='store_true',
+                        help='Write each peripheral into a separate file in a directory named like the output file')
+    parser.add_argument('--jobs', '-j', metavar='N', type=int,
+                        help='Number of processes to render peripherals or files (default: number of CPUs)')
+    parser.add_argument('--manifest', metavar='FILE', type=str,
+                        help='Manifest of rendered peripherals to regenerate only changed ones, template with {name} for batches')
+    parser.add_argument('--force', action='store_true', help='Render all peripherals, even if unchanged in manifest')
+    parser.add_argument('--templates', metavar='DIR', type=str, help='Directory with templates <name>.tmpl overriding the defaults')
+    parser.add_argument('--version', action='version', version=pysvd.__version__)
+    args = parser.parse_args()
 
-    output.write("Autogenerated ReST with pysvd {}\n".format(pysvd.__version__))
-    output.close()
+    pysvd.batch.main(parser, args, convert, __name__)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# coding: utf-8
+"""pysvd example project.
+
+Read SVD file and generate the vector table and startup code of a Cortex-M device for GCC and Clang.
+"""
+
+import argparse
+import xml.etree.ElementTree as ET
+import pysvd
+
+# Default templates, name -> (text, fields)
+templates = pysvd.template.Templates({
+    'header': ("/**\n * @file\n * @version {version}\n * @brief Vector table and startup code for {vendor} {name}\n"
+               " * @note This file is autogenerated using pysvd {pysvd}\n */\n\n"
+               "#include <stdint.h>\n\n"
+               "#ifndef __NVIC_PRIO_BITS\n#define __NVIC_PRIO_BITS {prio_bits} /*!< Number of bits used for priority levels */\n#endif\n"
+               "#ifndef __VTOR_PRESENT\n#define __VTOR_PRESENT {vtor} /*!< Vector table offset register present */\n#endif\n\n"
+               "/* Symbols of the linker script */\n"
+               "extern uint32_t __StackTop;\nextern uint32_t __etext;\n"
+               "extern uint32_t __data_start__;\nextern uint32_t __data_end__;\n"
+               "extern uint32_t __bss_start__;\nextern uint32_t __bss_end__;\n\n"
+               "typedef void (*VECTOR_TABLE_Type)(void);\n\n"
+               "extern int main(void);\nvoid __attribute__((weak)) SystemInit(void)\n{{\n}}\n\n"
+               "void Reset_Handler(void);\nvoid Default_Handler(void);\n\n",
+               ('version', 'vendor', 'name', 'pysvd', 'prio_bits', 'vtor')),
+    'handlers': ("/* {title} */\n{handlers}\n", ('title', 'handlers')),
+    'handler': ("void {handler}(void) __attribute__((weak, alias(\"Default_Handler\")));\n", ('handler', 'name', 'number')),
+    'table': ("/* Vector table */\nextern const VECTOR_TABLE_Type __Vectors[{size}];\n"
+              "const VECTOR_TABLE_Type __Vectors[{size}] __attribute__((section(\".vectors\"), used)) =\n{{\n"
+              "    (VECTOR_TABLE_Type) &__StackTop, /*   0 Initial stack pointer */\n{vectors}}};\n\n", ('size', 'vectors')),
+    'vector': ("    {handler:32} /* {number:3} {name} */\n", ('handler', 'name', 'number')),
+    'reserved': ("    {handler:32} /* {number:3} Reserved */\n", ('handler', 'number')),
+    'reset': ("/* Copy .data from flash, clear .bss and call main */\nvoid Reset_Handler(void)\n{{\n"
+              "    uint32_t *source = &__etext;\n    uint32_t *destination;\n\n"
+              "    for (destination = &__data_start__; destination < &__data_end__;)\n    {{\n        *destination++ = *source++;\n    }}\n"
+              "    for (destination = &__bss_start__; destination < &__bss_end__;)\n    {{\n        *destination++ = 0;\n    }}\n\n"
+              "{vtor}    SystemInit();\n    main();\n\n    while (1)\n    {{\n    }}\n}}\n\n"
+              "void Default_Handler(void)\n{{\n    while (1)\n    {{\n    }}\n}}\n", ('vtor', )),
+    'vtor': ("#if __VTOR_PRESENT\n    *(volatile uint32_t *) 0xE000ED08UL = (uint32_t) (uintptr_t) __Vectors; /* SCB->VTOR */\n"
+             "#endif\n", ()),
+})
+
+
+def convert(svd, target, args):
+    """Convert SVD file into C vector table and startup file"""
+    node = ET.parse(svd).getroot()
+    device = pysvd.element.Device(node)
+
+    # The interrupt index is cached by the device, the table is a single pass over its vectors
+    interrupts = device.interrupts
+    cpu = getattr(device, 'cpu', None)
+    if not interrupts.exceptions:
+        raise ValueError("Device '{}' has no Cortex-M cpu".format(device.name))
+
+    core = {exception.number: exception for exception in interrupts.exceptions}
+    vectors = [('Reset_Handler,', 'Reset', 1)]
+    for number in range(2, 16):
+        exception = core.get(number)
+        if exception is None:
+            vectors.append(('0,', None, number))
+        else:
+            vectors.append((exception.handler + ',', exception.name, number))
+
+    # Interrupts with several values share the handler
+    handlers = []
+    seen = set()
+    for (value, interrupt) in enumerate(interrupts.vectors()):
+        if interrupt is None:
+            vectors.append(('0,', None, value + 16))
+            continue
+        handler = pysvd.layout.identifier(interrupt.name) + '_IRQHandler'
+        vectors.append((handler + ',', interrupt.name, value + 16))
+        if handler not in seen:
+            seen.add(handler)
+            handlers.append((handler, interrupt.name, value + 16))
+
+    with pysvd.output.Writer(target) as output:
+        output.write(templates['header'](device.version, getattr(device, 'vendor', ''), device.name, pysvd.__version__,
+                                         getattr(cpu, 'nvicPrioBits', 4), int(getattr(cpu, 'vtorPresent', True))))
+        core_handlers = [(exception.handler, exception.name, exception.number) for exception in interrupts.exceptions]
+        output.write(templates['handlers']('Core exception handlers', templates['handler'].join(core_handlers)))
+        if handlers:
+            output.write(templates['handlers']('Interrupt handlers', templates['handler'].join(handlers)))
+        lines = [templates['vector'](handler, name, number) if name is not None else templates['reserved'](handler, number)
+                 for (handler, name, number) in vectors]
+        output.write(templates['table'](len(vectors) + 1, ''.join(lines)))
+        output.write(templates['reset'](templates['vtor']()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SVD to Cortex-M vector table and startup code')
+    parser.add_argument('--svd', metavar='FILE', type=str, nargs='+', help='System view description (SVD) files or directories',
+                        required=True)
+    parser.add_argument('--output', '-o',  metavar='FILE', type=str, help='C output file, template with {name} of SVD file for batches',
+                        required=True)
+    parser.add_argument('--jobs', '-j', metavar='N', type=int, help='Number of processes to convert files (default: number of CPUs)')
+    parser.add_argument('--templates', metavar='DIR', type=str, help='Directory with templates <name>.tmpl overriding the defaults')
+    parser.add_argument('--version', action='version', version=pysvd.__version__)
+    args = parser.parse_args()
+
+    pysvd.batch.main(parser, args, convert, __name__)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,11 +3,15 @@
 """Read SVD file, order elements, check for valid elements to generate register access structs and displays possible substitutions.
 """
 
+import io
+import re
 import sys
+import json
 import argparse
+import itertools
+import concurrent.futures
 import xml.etree.ElementTree as ET
 from enum import IntEnum
-import itertools
 from natsort import natsorted
 from colorama import Fore, Back, Style
 
@@ -35,137 +39,382 @@ def integer(value):
         value = value.replace('x', '0')
     return int(value, 0)
 
-def compare_peripherals(level, peripherals):
-    """Compare peripherals."""
-
-    print("{0.CYAN}Peripherals{0.RESET}".format(Fore))
-
-    peripherals_base = []
-    peripherals_derived = []
-    peripherals_not_derived = []
-    for a, b in itertools.combinations(peripherals, 2):
-        # Check if item is already in list
-        if a in peripherals_derived + peripherals_not_derived:
+def path(element):
+    """Get dotted path of element from its peripheral (e.g. 'TIMER0.CR.EN'). Unnamed elements are skipped."""
+    names = []
+    while element is not None and not isinstance(element, pysvd.element.Device):
+        name = getattr(element, 'name', None)
+        if name is not None:
+            names.append(name)
+        element = element.parent
+    return '.'.join(reversed(names))
+
+def group_duplicates(elements, key=lambda element: element.digest_struct()):
+    """Group structural equal elements by their structural digest (or the given key). Groups are returned in order of their first
+    element."""
+    groups = {}
+    for element in elements:
+        groups.setdefault(key(element), []).append(element)
+    return list(groups.values())
+
+class TextOutput(object):
+    """Colored text output of findings and messages on stdout."""
+
+    formats = {
+        'ok': "[{0.GREEN}OK{0.RESET}] {1[kind]} '{1[name]}' is derived from '{1[base]}'",
+        'warning': "[{0.RED}WARNING{0.RESET}] {1[kind]} '{1[name]}' can be derived from '{1[base]}'",
+        'hint': "[{0.YELLOW}HINT{0.RESET}] {1[kind]} '{1[name]}' can not be derived",
+    }
+
+    def __init__(self, file):
+        self.file = file
+
+    def message(self, text=''):
+        self.file.write(text + '\n')
+
+    def section(self, title, findings):
+        lines = ["{0.CYAN}{1}{0.RESET}".format(Fore, title)]
+        lines += [self.formats[finding['status']].format(Fore, finding) for finding in findings]
+        self.file.write('\n'.join(lines) + '\n\n')
+
+    def close(self):
+        self.file.flush()
+
+class JsonLinesOutput(TextOutput):
+    """One JSON object per finding and line, messages on stderr."""
+
+    # Additional members of each finding, e.g. the SVD file in batches
+    extra = {}
+
+    def message(self, text=''):
+        if text:
+            sys.stderr.write(text + '\n')
+
+    def section(self, title, findings):
+        self.file.write(''.join(json.dumps(dict(finding, section=title, **self.extra)) + '\n' for finding in findings))
+
+class JsonOutput(JsonLinesOutput):
+    """JSON array of findings, streamed while findings are produced."""
+
+    def __init__(self, file):
+        super().__init__(file)
+        self.separator = '[\n'
+
+    def section(self, title, findings):
+        for finding in findings:
+            self.file.write(self.separator + json.dumps(dict(finding, section=title, **self.extra)))
+            self.separator = ',\n'
+
+    def close(self):
+        self.file.write('[]\n' if self.separator == '[\n' else '\n]\n')
+        super().close()
+
+outputs = {'text': TextOutput, 'json': JsonOutput, 'jsonl': JsonLinesOutput}
+
+def compare_digests(level, kind, items):
+    """Group list of (name, path, key, digest, (name, path) of derivedFrom or None) by key and return
+    (findings, indices_base, indices_none_derivable).
+
+    Works on plain tuples, so it can run in worker processes."""
+
+    findings = []
+    indices_base = []
+    indices_none_derivable = []
+    groups = {}
+    for (index, item) in enumerate(items):
+        groups.setdefault(item[2], []).append(index)
+
+    for group in groups.values():
+        a = group[0]
+        if len(group) == 1:
+            indices_none_derivable.append(a)
             continue
 
-        if a.equal_struct(b):
-            if a not in peripherals_base:
-                peripherals_base.append(a)
-
-            # Already derived peripheral
-            if b.derivedFrom:
+        indices_base.append(a)
+        for b in group[1:]:
+            (name, path, key, digest, derivedFrom) = items[b]
+            # Already derived element
+            if derivedFrom is not None:
                 if level >= Level.all:
-                    print("[{0.GREEN}OK{0.RESET}] Peripheral '{2.name}' is derived from '{1.name}'".format(Fore, b.derivedFrom, b))
-                peripherals_derived.append(b)
-            # Derivable peripheral
+                    findings.append({'status': 'ok', 'kind': kind, 'name': name, 'path': path, 'digest': digest,
+                                     'base': derivedFrom[0], 'base_path': derivedFrom[1]})
+            # Derivable element
             else:
                 if level >= Level.warning:
-                    print("[{0.RED}WARNING{0.RESET}] Peripheral '{2.name}' can be derived from '{1.name}'".format(Fore, a, b))
-                peripherals_not_derived.append(b)
-
-    peripherals_none_derivable = [peripheral for peripheral in peripherals \
-        if peripheral not in peripherals_base and \
-            peripheral not in peripherals_derived and \
-            peripheral not in peripherals_not_derived]
+                    findings.append({'status': 'warning', 'kind': kind, 'name': name, 'path': path, 'digest': digest,
+                                     'base': items[a][0], 'base_path': items[a][1]})
 
     if level >= Level.hint:
-        for peripheral in peripherals_none_derivable:
-            print("[{0.YELLOW}HINT{0.RESET}] Peripheral '{1.name}' can not be derived".format(Fore, peripheral))
-    print()
+        for index in indices_none_derivable:
+            (name, path, key, digest, derivedFrom) = items[index]
+            findings.append({'status': 'hint', 'kind': kind, 'name': name, 'path': path, 'digest': digest})
 
-    return (peripherals_base, peripherals_none_derivable)
+    return (findings, indices_base, indices_none_derivable)
 
-def compare_registers(level, peripheral, registers):
-    print("{0.CYAN}Registers of peripheral '{1}'{0.RESET}".format(Fore, peripheral.name))
+def digests(elements, key=lambda element: element.digest_struct(), name=lambda element: element.name):
+    """Get lightweight list of (name, path, key, digest, (name, path) of derivedFrom or None) of elements."""
+    return [(name(element), path(element), key(element), element.digest_struct(),
+             (name(element.derivedFrom), path(element.derivedFrom)) if element.derivedFrom else None) for element in elements]
 
-    registers_base = []
-    registers_derived = []
-    registers_not_derived = []
+def compare(output, level, title, kind, elements, key=lambda element: element.digest_struct(), name=lambda element: element.name):
+    """Output derived and derivable elements and return (elements_base, elements_none_derivable)."""
 
-    for a, b in itertools.combinations(registers, 2):
-        # Check if item is already in list
-        if a in registers_derived + registers_not_derived:
-            continue
+    (findings, indices_base, indices_none_derivable) = compare_digests(level, kind, digests(elements, key, name))
+    output.section(title, findings)
 
-        if a.equal_struct(b):
-            if a not in registers_base:
-                registers_base.append(a)
+    return ([elements[index] for index in indices_base], [elements[index] for index in indices_none_derivable])
 
-            # Already derived register
-            if b.derivedFrom:
-                if level >= Level.all:
-                    print("[{0.GREEN}OK{0.RESET}] Register '{2.name}' is derived from '{1.name}'".format(Fore, b.derivedFrom, b))
-                registers_derived.append(b)
-            # Derivable register
-            else:
-                if level >= Level.warning:
-                    print("[{0.RED}WARNING{0.RESET}] Register '{2.name}' can be derived from '{1.name}'".format(Fore, a, b))
-                registers_not_derived.append(b)
+def compare_peripherals(output, level, peripherals):
+    """Compare peripherals."""
 
-    registers_none_derivable = [register for register in registers \
-        if register not in registers_base and \
-            register not in registers_derived and \
-            register not in registers_not_derived]
+    return compare(output, level, 'Peripherals', 'Peripheral', peripherals)
 
-    if level >= Level.hint:
-        for register in registers_none_derivable:
-            print("[{0.YELLOW}HINT{0.RESET}] Register '{1.name}' can not be derived".format(Fore, register))
-    print()
+def compare_registers(output, level, peripheral, registers):
+    """Compare registers of peripheral."""
 
-    return (registers_base, registers_none_derivable)
+    return compare(output, level, "Registers of peripheral '{}'".format(peripheral.name), 'Register', registers)
 
-def main():
-    parser = argparse.ArgumentParser(description='Read SVD file, order elements, check for' \
-        'valid elements to generate register access structs and displays possible substitutions.')
-    parser.add_argument('--svd', metavar='FILE', type=str, help='System view description (SVD) file', required=True)
-    parser.add_argument('--output', '-o', metavar='FILE', type=str, help='Save ordered SVD output file')
-    parser.add_argument('--level', '-l', choices=['all', 'hint', 'warning'], help='Select level of output messages', default='all')
-    parser.add_argument('--depth', '-d', choices=['peripherals', 'registers', 'fields', 'enumeratedValues'], help='Select depth of analysis', default='enumeratedValues')
-    parser.add_argument('--sort', action='store_true', help='Sort elements before comparing')
-    args = parser.parse_args()
-    level = Level[args.level]
-    depth = Depth[args.depth]
+def compare_registers_parallel(output, level, peripherals, jobs):
+    """Compare registers of all peripherals in a pool of jobs processes and output results in order of peripherals. Digests are computed
+    here, workers only group them. Returns list of base and none derivable registers."""
 
-    xml = ET.parse(args.svd)
+    items = [digests(peripheral.registers) for peripheral in peripherals]
+    output.file.flush()
+    with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+        chunksize = max(1, len(items) // (4 * jobs))
+        results = executor.map(compare_digests, itertools.repeat(int(level)), itertools.repeat('Register'), items, chunksize=chunksize)
 
-    if args.sort:
-      print('Sort peripherals by name')
-      for peripherals in xml.findall('.//peripherals'):
-          peripherals[:] = natsorted(peripherals, key=lambda x: x.find('name').text)
+        registers = []
+        for (peripheral, (findings, indices_base, indices_none_derivable)) in zip(peripherals, results):
+            output.section("Registers of peripheral '{}'".format(peripheral.name), findings)
+            registers += [peripheral.registers[index] for index in indices_base + indices_none_derivable]
+    return registers
+
+def compare_fields(output, level, fields):
+    """Compare fields of all registers at once. Fields are equal with same width and enumeratedValues, fields without enumeratedValues
+    are skipped."""
 
-      print('Sort registers by addressOffset')
-      for registers in xml.findall('.//registers'):
-          registers[:] = sorted(registers, key=lambda x: integer(x.find('addressOffset').text))
+    fields = [field for field in fields if hasattr(field, 'enumeratedValues')]
+    return compare(output, level, 'Fields', 'Field', fields, lambda field: (field.digest_struct(), field.bitWidth), path)
 
-      print('Sort fields by bitOffset')
-      for fields in xml.findall('.//fields'):
-          fields[:] = sorted(fields, key=lambda x: integer(x.find('bitOffset').text))
+def compare_enumerated_values(output, level, enumeratedValues):
+    """Compare enumeratedValues of all fields at once by their enumeratedValue entries."""
 
-      print('Sort enumeratedValues by value')
-      for enumeratedValues in xml.findall('.//enumeratedValues'):
-          enumeratedValues[:] = sorted(enumeratedValues, key=lambda x: integer(x.find('value').text) if x.tag == 'enumeratedValue' else -1)
+    return compare(output, level, 'EnumeratedValues', 'EnumeratedValues', enumeratedValues, name=path)
 
-    print('Remove linebreaks from description tags')
-    for item in xml.findall('.//description'):
-        text = item.text.replace('\n', ' ').strip()
-        item.text = ' '.join(text.split())
+def derive(elements, tag):
+    """Replace structural duplicates by a derivedFrom reference to the first element of their group and remove their child elements
+    (tag). Only elements overwriting every other tag of the base are replaced, so no attribute changes by inheritance (interrupts are not
+    inherited). Returns number of replaced elements."""
 
-    if args.output:
-        xml.write(args.output, encoding="utf-8", xml_declaration=True, method="xml", short_empty_elements=True)
-    print()
+    count = 0
+    for group in group_duplicates(elements):
+        a = group[0]
+        if a.node.find('dim') is not None:
+            continue
+
+        tags = {child.tag for child in a.node} - {tag, 'interrupt'}
+        for b in group[1:]:
+            children = b.node.find(tag)
+            if b.derivedFrom or children is None or b.node.find('dim') is not None:
+                continue
+            if not tags <= {child.tag for child in b.node} or b.node.find('description') is None:
+                continue
+
+            b.node.set('derivedFrom', a.name)
+            b.node.remove(children)
+            count += 1
+    return count
+
+def signature(node):
+    """Get comparable signature of node and all its children."""
+    return (node.tag, tuple(sorted(node.attrib.items())), (node.text or '').strip(), tuple(signature(child) for child in node))
+
+def collapse(registers, referenced):
+    """Collapse runs of registers named NAME<n> with consecutive index, constant address increment and otherwise equal content into dim
+    arrays. Registers referenced by derivedFrom are kept. Returns number of created arrays."""
+
+    def template(node):
+        match = re.fullmatch(r'(.*?)(0|[1-9][0-9]*)', node.findtext('name', ''))
+        if node.tag != 'register' or match is None or node.find('dim') is not None or match.group(0) in referenced:
+            return None
+
+        (name, index) = (match.group(1), match.group(2))
+        element = ET.Element(node.tag, node.attrib)
+        for child in node:
+            if child.tag == 'addressOffset':
+                continue
+            copy = ET.SubElement(element, child.tag, child.attrib)
+            copy[:] = child[:]
+            copy.text = child.text
+            if child.tag in ('name', 'displayName', 'description') and child.text is not None:
+                copy.text = child.text.replace(name + index, name + '%s')
+        return (name, int(index), integer(node.findtext('addressOffset', '')), signature(element))
+
+    count = 0
+    nodes = list(registers)
+    templates = [template(node) for node in nodes]
+    start = 0
+    while start < len(nodes):
+        end = start + 1
+        if templates[start] is not None:
+            (name, index, offset, sign) = templates[start]
+            while end < len(nodes) and templates[end] is not None:
+                (name_, index_, offset_, sign_) = templates[end]
+                increment = offset_ - templates[end - 1][2]
+                if name_ != name or sign_ != sign or index_ != index + end - start or increment <= 0 or \
+                        (end - start > 1 and increment != templates[start + 1][2] - offset):
+                    break
+                end += 1
+
+        if end - start > 1:
+            first = nodes[start]
+            for child in first:
+                if child.tag in ('name', 'displayName', 'description') and child.text is not None:
+                    child.text = child.text.replace(name + str(index), name + '%s')
+
+            elements = [('dim', str(end - start)), ('dimIncrement', hex(templates[start + 1][2] - offset)),
+                        ('dimIndex', '{}-{}'.format(index, index + end - start - 1))]
+            for (position, (tag, text)) in enumerate(elements):
+                element = ET.Element(tag)
+                element.text = text
+                element.tail = first.text
+                first.insert(position, element)
+
+            first.tail = nodes[end - 1].tail
+            for node in nodes[start + 1:end]:
+                registers.remove(node)
+            count += 1
+        start = end
+    return count
+
+def rewrite(output, xml, device, peripherals):
+    """Compact SVD: derive duplicate peripherals and registers and collapse regular registers into dim arrays."""
+
+    output.message('Derive duplicate peripherals')
+    count = derive(device.peripherals, 'registers')
+    output.message('Derived {} peripherals'.format(count))
+
+    output.message('Derive duplicate registers')
+    count = 0
+    for peripheral in peripherals:
+        # Registers of derived peripherals are nodes of their base
+        if peripheral.derivedFrom is None:
+            count += derive(peripheral.registers, 'fields')
+    output.message('Derived {} registers'.format(count))
+
+    output.message('Collapse registers into dim arrays')
+    referenced = {node.get('derivedFrom').split('.')[-1] for node in xml.iter() if node.get('derivedFrom') is not None}
+    count = sum(collapse(registers, referenced) for registers in xml.iter('registers'))
+    output.message('Created {} dim arrays'.format(count))
+    output.message()
+
+def save(xml, filename):
+    """Write SVD XML tree to file, the file is replaced atomically and only if changed"""
+    with pysvd.output.Writer(filename, binary=True) as file:
+        xml.write(file, encoding="utf-8", xml_declaration=True, method="xml", short_empty_elements=True)
+
+
+def analyze(output, args, level, depth):
+    """Run analysis of SVD file and write results to output."""
+
+    xml = ET.parse(args.svd)
+
+    if args.sort:
+        output.message('Sort peripherals by name, registers by addressOffset, fields by bitOffset and enumeratedValues by value')
+    output.message('Remove linebreaks from description tags')
+    pysvd.canonical.canonicalize(xml.getroot(), args.sort)
+
+    if args.output and not args.rewrite:
+        save(xml, args.output)
+    output.message()
 
     # Load cleaned-up SVD file
     try:
         device = pysvd.element.Device(xml.getroot())
     except Exception as e:
-        print("Error parsing SVD file: {}".format(str(e)))
-        sys.exit(2)
+        raise SyntaxError("Error parsing SVD file: {}".format(str(e))) from e
+
+    for message in device.interrupts.problems():
+        output.message(message)
 
-    (peripherals_base, peripherals_none_derivable) = compare_peripherals(level, device.peripherals)
+    (peripherals_base, peripherals_none_derivable) = compare_peripherals(output, level, device.peripherals)
     if depth >= Depth.registers:
         peripherals = natsorted(peripherals_base + peripherals_none_derivable, key=lambda peripheral: peripheral.name)
-        for peripheral in peripherals:
-            compare_registers(level, peripheral, peripheral.registers)
+        # Grouping precomputed digests is cheap, a process pool only pays off for many peripherals and is used on request
+        if args.jobs is None or args.jobs <= 1:
+            registers = []
+            for peripheral in peripherals:
+                (registers_base, registers_none_derivable) = compare_registers(output, level, peripheral, peripheral.registers)
+                registers += registers_base + registers_none_derivable
+        else:
+            registers = compare_registers_parallel(output, level, peripherals, args.jobs)
+
+        if depth >= Depth.fields:
+            fields = [field for register in registers for field in register.fields]
+            (fields_base, fields_none_derivable) = compare_fields(output, level, fields)
+
+            if depth >= Depth.enumeratedValues:
+                compare_enumerated_values(output, level, [field.enumeratedValues for field in fields_base + fields_none_derivable])
+
+    if args.rewrite:
+        rewrite(output, xml, device, natsorted(peripherals_base + peripherals_none_derivable, key=lambda peripheral: peripheral.name))
+        save(xml, args.output)
+
+def convert(svd, target, args):
+    """Analyze SVD file in batch, returns findings rendered in selected format"""
+    file = io.StringIO()
+    output = outputs[args.format](file)
+    if args.format == 'text':
+        output.message("{}{}{}".format(Fore.CYAN, svd, Fore.RESET))
+    else:
+        output.extra = {'svd': svd}
+    analyze(output, argparse.Namespace(**dict(vars(args), svd=svd, output=target)), Level[args.level], Depth[args.depth])
+    output.close()
+    return file.getvalue()
+
+def main():
+    parser = argparse.ArgumentParser(description='Read SVD file, order elements, check for' \
+        'valid elements to generate register access structs and displays possible substitutions.')
+    parser.add_argument('--svd', metavar='FILE', type=str, nargs='+', help='System view description (SVD) files or directories',
+                        required=True)
+    parser.add_argument('--output', '-o', metavar='FILE', type=str,
+                        help='Save ordered SVD output file, template with {name} of SVD file for batches')
+    parser.add_argument('--level', '-l', choices=['all', 'hint', 'warning'], help='Select level of output messages', default='all')
+    parser.add_argument('--depth', '-d', choices=['peripherals', 'registers', 'fields', 'enumeratedValues'], help='Select depth of analysis', default='enumeratedValues')
+    parser.add_argument('--sort', action='store_true', help='Sort elements before comparing')
+    parser.add_argument('--jobs', '-j', metavar='N', type=int,
+                        help='Number of processes to compare registers (default: serial) or analyze files (default: number of CPUs)')
+    parser.add_argument('--format', '-f', choices=['text', 'json', 'jsonl'], help='Select format of output messages', default='text')
+    parser.add_argument('--rewrite', action='store_true', help='Save compacted SVD output file with derived duplicates and dim arrays')
+    args = parser.parse_args()
+    if args.rewrite and not args.output:
+        parser.error('--rewrite requires --output')
+    level = Level[args.level]
+    depth = Depth[args.depth]
+
+    filenames = pysvd.batch.files(parser, args)
+
+    # Large buffer for many findings, stdout itself is not closed
+    stdout = open(sys.stdout.fileno(), 'w', encoding='utf-8', buffering=1 << 16, closefd=False)
+    if len(filenames) == 1:
+        output = outputs[args.format](stdout)
+        target = pysvd.batch.output_name(args.output, filenames[0]) if args.output else None
+        try:
+            analyze(output, argparse.Namespace(**dict(vars(args), svd=filenames[0], output=target)), level, depth)
+        except SyntaxError as e:
+            output.message(str(e))
+            sys.exit(2)
+        finally:
+            output.close()
+        return
+
+    if args.format == 'json':
+        parser.error('--format json supports only one SVD file, use jsonl for multiple files')
+
+    # Batch, files are analyzed in parallel and their findings written in order of files
+    results = pysvd.batch.run(convert, filenames, args.output, (argparse.Namespace(**dict(vars(args), jobs=1)), ), args.jobs)
+    pysvd.batch.finish(parser, results, len(filenames), stdout)
 
 if __name__ == '__main__':
     main()
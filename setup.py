@@ -41,6 +41,7 @@ setuptools.setup(
         'console_scripts': [
             'svd2rst = scripts.svd2rst:main',
             'svd2register = scripts.svd2register:main',
+            'svd2vector = scripts.svd2vector:main',
             'svd_duplicates = scripts.svd_duplicates:main',
         ],
     },
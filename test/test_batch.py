@@ -0,0 +1,93 @@
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+import pysvd
+
+templates = pysvd.template.Templates({'title': ('{name}', ('name', ))})
+
+
+def convert(filename, output, prefix):
+    device = pysvd.element.Device(ET.parse(filename).getroot())
+    with open(output, 'w') as file:
+        file.write(prefix + device.name)
+    return len(device.peripherals)
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'sub'))
+        shutil.copy('test/example.svd', os.path.join(self.directory, 'sub', 'example.svd'))
+        with open(os.path.join(self.directory, 'broken.SVD'), 'w') as file:
+            file.write('<device>')
+        with open(os.path.join(self.directory, 'README'), 'w') as file:
+            file.write('ignored')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_inputs(self):
+        self.assertEqual(pysvd.batch.inputs([self.directory, 'test/example.svd']),
+                         [os.path.join(self.directory, 'broken.SVD'), os.path.join(self.directory, 'sub', 'example.svd'),
+                          'test/example.svd'])
+
+    def test_output_name(self):
+        self.assertEqual(pysvd.batch.output_name('doc/{name}.rst', 'svd/example.svd'), 'doc/example.rst')
+        self.assertEqual(pysvd.batch.output_name('{directory}/{name}.h', 'svd/example.svd'), 'svd/example.h')
+
+    def run_batch(self, jobs):
+        filenames = pysvd.batch.inputs([self.directory])
+        template = os.path.join(self.directory, 'out', '{name}.txt')
+        (broken, example) = pysvd.batch.run(convert, filenames, template, ('Device ', ), jobs)
+
+        self.assertIsNone(broken.value)
+        self.assertIn('ParseError', broken.error)
+        self.assertEqual((example.value, example.error), (3, None))
+        with open(example.output, 'r') as file:
+            self.assertEqual(file.read(), 'Device ARM_Example')
+        self.assertEqual(pysvd.batch.report([broken, example], io.StringIO()), 1)
+
+    def test_run(self):
+        self.run_batch(1)
+
+    def test_run_parallel(self):
+        self.run_batch(2)
+
+    def test_files(self):
+        parser = argparse.ArgumentParser()
+        args = argparse.Namespace(svd=[self.directory], output='out/{name}.rst', manifest=None)
+        self.assertEqual(len(pysvd.batch.files(parser, args)), 2)
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                pysvd.batch.files(parser, argparse.Namespace(svd=[self.directory], output='out/{name}.rst', manifest='manifest'))
+            os.mkdir(os.path.join(self.directory, 'empty'))
+            with self.assertRaises(SystemExit):
+                pysvd.batch.files(parser, argparse.Namespace(svd=[os.path.join(self.directory, 'empty')], output='out.rst'))
+
+    def test_finish(self):
+        parser = argparse.ArgumentParser()
+        output = io.StringIO()
+        pysvd.batch.finish(parser, [pysvd.batch.Result('a.svd', None, 'a', None)], 1, output)
+        self.assertEqual(output.getvalue(), 'a')
+
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            with self.assertRaises(SystemExit) as context:
+                pysvd.batch.finish(parser, [pysvd.batch.Result('b.svd', None, None, 'error')], 2, output)
+        self.assertEqual(context.exception.code, 1)
+        self.assertIn("Error converting 'b.svd'", stderr.getvalue())
+
+    def test_load_templates(self):
+        pysvd.batch.load_templates(__name__, None)
+        self.assertEqual(templates['title']('TIMER0'), 'TIMER0')
+        with open(os.path.join(self.directory, 'title.tmpl'), 'w') as file:
+            file.write('= {name} =')
+        pysvd.batch.load_templates(__name__, self.directory)
+        self.assertEqual(templates['title']('TIMER0'), '= TIMER0 =')
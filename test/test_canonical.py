@@ -0,0 +1,56 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+import pysvd
+
+
+class TestCanonical(unittest.TestCase):
+
+    def test_natural(self):
+        self.assertEqual(sorted(['TIMER10', 'TIMER2', 'ADC'], key=pysvd.canonical.natural), ['ADC', 'TIMER2', 'TIMER10'])
+
+    def test_canonicalize(self):
+        node = ET.fromstring('''<device>
+            <peripherals>
+                <peripheral><name>TIMER10</name><description>Timer
+                    ten</description>
+                    <registers>
+                        <register><name>SR</name><addressOffset>0x4</addressOffset>
+                            <fields>
+                                <field><name>B</name><bitRange>[7:4]</bitRange></field>
+                                <field><name>A</name><lsb>0</lsb><msb>3</msb></field>
+                            </fields>
+                        </register>
+                        <cluster><name>CL</name><addressOffset>0x10</addressOffset></cluster>
+                        <register><name>CR</name><addressOffset>0</addressOffset>
+                            <fields>
+                                <field><name>EN</name><bitOffset>0</bitOffset>
+                                    <enumeratedValues>
+                                        <enumeratedValue><name>Other</name><isDefault>true</isDefault></enumeratedValue>
+                                        <enumeratedValue><name>On</name><value>#1x</value></enumeratedValue>
+                                        <enumeratedValue><name>Off</name><value>0</value></enumeratedValue>
+                                        <name>Enable</name>
+                                    </enumeratedValues>
+                                </field>
+                            </fields>
+                        </register>
+                    </registers>
+                </peripheral>
+                <peripheral><name>TIMER2</name></peripheral>
+            </peripherals>
+        </device>''')
+
+        pysvd.canonical.canonicalize(node)
+        self.assertEqual([item.text for item in node.findall('peripherals/peripheral/name')], ['TIMER2', 'TIMER10'])
+        self.assertEqual(node.find('.//description').text, 'Timer ten')
+        self.assertEqual([item.text for item in node.find('.//registers').findall('*/name')], ['CR', 'SR', 'CL'])
+        self.assertEqual([item.text for item in node.findall(".//register[name='SR']/fields/field/name")], ['A', 'B'])
+        self.assertEqual([item.findtext('name', item.text) for item in node.find('.//enumeratedValues')], ['Enable', 'Off', 'On', 'Other'])
+
+    def test_canonicalize_no_sort(self):
+        node = ET.fromstring('<peripherals><peripheral><name>B</name><description> b\n b </description></peripheral>'
+                             '<peripheral><name>A</name></peripheral></peripherals>')
+
+        pysvd.canonical.canonicalize(node, False)
+        self.assertEqual([item.text for item in node.findall('peripheral/name')], ['B', 'A'])
+        self.assertEqual(node.find('.//description').text, 'b b')
@@ -13,6 +13,16 @@ class HelperClassGroupAttributes(pysvd.classes.Group):
         super().__init__(parent, node)
 
 
+# Used in TestClassGroup.test_group_instance_values
+class HelperClassGroupDefaults(pysvd.classes.Group):
+
+    size = 32
+
+    @property
+    def resetValue(self):
+        return 0x1234
+
+
 class HelperClassDeriveRoot(pysvd.classes.Base):
 
     def __init__(self, node):
@@ -296,6 +306,22 @@ class TestClassGroup(unittest.TestCase):
         with self.assertRaises(AttributeError):
             self.assertIsNone(child.reset_value)
 
+    def test_group_instance_values(self):
+        '''Only values set on parent instances are inherited, class attributes and properties of parents are not'''
+        test = HelperClassGroupDefaults(None, None)
+        child = pysvd.classes.Group(test, None)
+        subchild = pysvd.classes.Group(child, None)
+
+        self.assertEqual(test.size, 32)
+        self.assertEqual(test.resetValue, 0x1234)
+        with self.assertRaises(AttributeError):
+            self.assertIsNone(subchild.size)
+        with self.assertRaises(AttributeError):
+            self.assertIsNone(subchild.resetValue)
+
+        test.__dict__['size'] = 16
+        self.assertEqual(subchild.size, 16)
+
 
 class TestClassDerive(unittest.TestCase):
 
@@ -0,0 +1,60 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+import pysvd
+from pysvd.compare import Kind
+
+
+class TestCompare(unittest.TestCase):
+
+    def setUp(self):
+        self.old = ET.parse("test/example.svd").getroot()
+        self.new = ET.parse("test/example.svd").getroot()
+
+    def register(self, root, name):
+        return [node for node in root.iter('register') if node.find('name').text == name][0]
+
+    def field(self, root, register, name):
+        return [node for node in self.register(root, register).iter('field') if node.find('name').text == name][0]
+
+    def diff(self):
+        changes = list(pysvd.diff(pysvd.element.Device(self.old), pysvd.element.Device(self.new)))
+        return [(change.kind, change.path, change.attribute) for change in changes if change.path.startswith('TIMER0')]
+
+    def test_equal(self):
+        self.assertEqual(self.diff(), [])
+
+    def test_changed(self):
+        self.register(self.new, 'CR').find('resetValue').text = '0x1'
+        self.assertEqual(self.diff(), [(Kind.changed, 'TIMER0.CR', 'resetValue')])
+
+    def test_moved(self):
+        self.register(self.new, 'COUNT').find('addressOffset').text = '0x30'
+        self.assertEqual(self.diff(), [(Kind.moved, 'TIMER0.COUNT', 'addressOffset')])
+
+    def test_removed(self):
+        registers = self.new.find('peripherals/peripheral/registers')
+        registers.remove(self.register(self.new, 'MATCH'))
+        changes = self.diff()
+        self.assertEqual(changes, [(Kind.removed, 'TIMER0.MATCH', None)])
+
+    def test_added(self):
+        registers = self.old.find('peripherals/peripheral/registers')
+        registers.remove(self.register(self.old, 'MATCH'))
+        self.assertEqual(self.diff(), [(Kind.added, 'TIMER0.MATCH', None)])
+
+    def test_renamed(self):
+        self.field(self.new, 'SR', 'RUN').find('name').text = 'BUSY'
+        self.assertEqual(self.diff(), [(Kind.renamed, 'TIMER0.SR.RUN', None)])
+
+    def test_enumerated_value(self):
+        node = self.field(self.new, 'SR', 'RUN')
+        node.find('enumeratedValues/enumeratedValue/value').text = '1'
+        node.findall('enumeratedValues/enumeratedValue')[1].find('value').text = '0'
+        self.assertEqual(self.diff(), [(Kind.changed, 'TIMER0.SR.RUN.Stopped', 'value'), (Kind.changed, 'TIMER0.SR.RUN.Running', 'value')])
+
+    def test_derived(self):
+        self.register(self.new, 'CR').find('resetValue').text = '0x1'
+        changes = list(pysvd.diff(pysvd.element.Device(self.old), pysvd.element.Device(self.new)))
+        self.assertEqual([change.path for change in changes], ['TIMER0.CR', 'TIMER1.CR', 'TIMER2.CR'])
+        self.assertEqual(str(changes[0]), 'changed TIMER0.CR.resetValue: 0 -> 1')
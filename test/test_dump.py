@@ -0,0 +1,69 @@
+import io
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+import pysvd
+
+
+class TestDump(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        node = ET.parse("test/example.svd").getroot()
+        cls.device = pysvd.element.Device(node)
+
+    def setUp(self):
+        # TIMER0.CR = 0x00000011, TIMER0.SR = 0x8001, TIMER0.INT (0x10) only partially dumped
+        data = bytearray(0x11)
+        data[0:4] = (0x00000011).to_bytes(4, 'little')
+        data[4:6] = (0x8001).to_bytes(2, 'little')
+
+        (handle, self.filename) = tempfile.mkstemp()
+        with os.fdopen(handle, 'wb') as file:
+            file.write(data)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_address_map(self):
+        address_map = self.device.address_map()
+
+        self.assertEqual(len(address_map), 33)
+        self.assertEqual(address_map[0][0], 0x40010000)
+        self.assertEqual(address_map[0][1], 'TIMER0.CR')
+        self.assertEqual(address_map[-1][0], 0x4001025C)
+        self.assertIs(address_map, self.device.address_map())
+
+    def test_registers(self):
+        with pysvd.dump.Dump(self.device, self.filename, 0x40010000) as dump:
+            registers = list(dump.registers())
+
+        self.assertEqual(len(registers), 2)
+        (path, value, fields) = registers[0]
+        self.assertEqual(path, 'TIMER0.CR')
+        self.assertEqual(value, 0x11)
+        self.assertEqual(fields['EN'], 1)
+        self.assertEqual(fields['MODE'], 1)
+
+        (path, value, fields) = registers[1]
+        self.assertEqual(path, 'TIMER0.SR')
+        self.assertEqual(value, 0x8001)
+        self.assertEqual(fields['RUN'], 1)
+
+    def test_base_address(self):
+        with pysvd.dump.Dump(self.device, self.filename, 0x40010004) as dump:
+            registers = list(dump.registers())
+
+        self.assertEqual([path for (path, value, fields) in registers], ['TIMER0.SR', 'TIMER0.INT'])
+
+    def test_write(self):
+        output = io.StringIO()
+        with pysvd.dump.Dump(self.device, self.filename, 0x40010000) as dump:
+            dump.write(output)
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], 'path,value,fields')
+        self.assertTrue(lines[1].startswith('TIMER0.CR,0x11,EN=1 '))
+        self.assertEqual(len(lines), 3)
@@ -576,6 +576,86 @@ class TestElementRegister(unittest.TestCase):
         self.assertIsNotNone(test.find("BIT1"))
         self.assertIsNone(test.find("BIT2"))
 
+    def test_encode(self):
+        xml = '''
+        <register>
+            <name>CTRL</name>
+            <addressOffset>0x0</addressOffset>
+            <access>read-write</access>
+            <resetValue>0x000000F1</resetValue>
+            <resetMask>0xFFFFFFFF</resetMask>
+            <size>32</size>
+            <fields>
+                <field>
+                    <name>EN</name>
+                    <bitOffset>0</bitOffset>
+                </field>
+                <field>
+                    <name>FLAG</name>
+                    <bitOffset>4</bitOffset>
+                    <bitWidth>2</bitWidth>
+                    <modifiedWriteValues>oneToClear</modifiedWriteValues>
+                </field>
+                <field>
+                    <name>MODE</name>
+                    <bitOffset>8</bitOffset>
+                    <bitWidth>2</bitWidth>
+                    <writeConstraint>
+                        <useEnumeratedValues>true</useEnumeratedValues>
+                    </writeConstraint>
+                    <enumeratedValues>
+                        <enumeratedValue>
+                            <name>slow</name>
+                            <value>0</value>
+                        </enumeratedValue>
+                        <enumeratedValue>
+                            <name>fast</name>
+                            <value>2</value>
+                        </enumeratedValue>
+                    </enumeratedValues>
+                </field>
+                <field>
+                    <name>DIV</name>
+                    <bitOffset>12</bitOffset>
+                    <bitWidth>4</bitWidth>
+                    <writeConstraint>
+                        <range>
+                            <minimum>1</minimum>
+                            <maximum>8</maximum>
+                        </range>
+                    </writeConstraint>
+                </field>
+                <field>
+                    <name>STATUS</name>
+                    <bitOffset>16</bitOffset>
+                    <access>read-only</access>
+                </field>
+            </fields>
+        </register>
+        '''
+
+        node = ET.fromstring(xml)
+        test = pysvd.element.Register(None, node)
+
+        # oneToClear field FLAG is not written back
+        self.assertEqual(test.encode(), 0x000000C1)
+        self.assertEqual(test.encode(EN=0, FLAG=1), 0x000000D0)
+        self.assertEqual(test.encode(MODE='fast', DIV=8), 0x000082C1)
+        self.assertEqual(test.encode_batch([{'EN': 0}, {'DIV': 1}]), [0x000000C0, 0x000010C1])
+
+        with self.assertRaises(KeyError):
+            test.encode(UNKNOWN=1)
+        with self.assertRaises(ValueError):
+            test.encode(STATUS=1)
+        with self.assertRaises(ValueError):
+            test.encode(EN=2)
+        with self.assertRaises(ValueError):
+            test.encode(MODE=1)
+        with self.assertRaises(ValueError):
+            test.encode(MODE='medium')
+        with self.assertRaises(ValueError):
+            test.encode(DIV=9)
+
 
 class TestElementWriteConstraint(unittest.TestCase):
 
@@ -814,6 +894,56 @@ class TestElementEnumberatedValues(unittest.TestCase):
         self.assertEqual(test.enumeratedValues[2].description, "Reserved values. Do not use.")
         self.assertTrue(test.enumeratedValues[2].isDefault)
 
+    def test_match(self):
+        xml = '''
+        <enumeratedValues>
+            <enumeratedValue>
+                <name>off</name>
+                <value>0</value>
+            </enumeratedValue>
+            <enumeratedValue>
+                <name>low</name>
+                <value>#0x1x</value>
+            </enumeratedValue>
+            <enumeratedValue>
+                <name>high</name>
+                <value>#1xxx</value>
+            </enumeratedValue>
+            <enumeratedValue>
+                <name>high_odd</name>
+                <value>#1xx1</value>
+            </enumeratedValue>
+            <enumeratedValue>
+                <name>other</name>
+                <isDefault>true</isDefault>
+            </enumeratedValue>
+        </enumeratedValues>'''
+
+        node = ET.fromstring(xml)
+        test = pysvd.element.EnumeratedValues(None, node)
+
+        self.assertEqual(test.match(0).name, "off")
+        self.assertEqual(test.match(0b0010).name, "low")
+        self.assertEqual(test.match(0b0111).name, "low")
+        self.assertEqual(test.match(0b1000).name, "high")
+        self.assertEqual(test.match(0b1011).name, "high_odd")
+        self.assertEqual(test.match(0b0001).name, "other")
+
+    def test_match_no_default(self):
+        xml = '''
+        <enumeratedValues>
+            <enumeratedValue>
+                <name>off</name>
+                <value>0</value>
+            </enumeratedValue>
+        </enumeratedValues>'''
+
+        node = ET.fromstring(xml)
+        test = pysvd.element.EnumeratedValues(None, node)
+
+        self.assertEqual(test.match(0).name, "off")
+        self.assertIsNone(test.match(1))
+
 
 class TestElementEnumberatedValue(unittest.TestCase):
 
@@ -852,6 +982,22 @@ class TestElementEnumberatedValue(unittest.TestCase):
         with self.assertRaises(AttributeError):
             self.assertIsNone(test.isDefault)
 
+        with self.assertRaises(AttributeError):
+            self.assertIsNone(test.pattern)
+
+    def test_attributes_pattern(self):
+        xml = '''
+        <enumeratedValue>
+            <name>enabled</name>
+            <value>#1x0x</value>
+        </enumeratedValue>'''
+
+        node = ET.fromstring(xml)
+        test = pysvd.element.EnumeratedValue(None, node)
+
+        self.assertEqual(test.value, 0b1000)
+        self.assertEqual(test.pattern, (0b1010, 0b1000))
+
     def test_attributes_isDefault(self):
         xml = '''
         <enumeratedValue>
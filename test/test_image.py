@@ -0,0 +1,70 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+import pysvd
+
+
+class TestImage(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        node = ET.parse("test/example.svd").getroot()
+        cls.device = pysvd.element.Device(node)
+        cls.image = cls.device.reset_image()
+
+    def test_blocks(self):
+        self.assertEqual(len(self.image.blocks), 3)
+
+        block = self.image.blocks[0]
+        self.assertEqual(block.address, 0x40010000)
+        self.assertEqual(block.size, 0x100)
+        self.assertEqual(len(block.registers), 11)
+        self.assertEqual(block.values.dtype.itemsize, 1)
+        self.assertTrue(block.covered[0:6].all())
+        self.assertFalse(block.covered[6:0x10].any())
+
+    def test_reset_state(self):
+        buffer = bytearray(0x300)
+        for block in self.image.blocks:
+            offset = block.address - 0x40010000
+            buffer[offset:offset + block.size] = block.values.tobytes()
+
+        snapshot = self.image.snapshot(buffer, 0x40010000)
+        self.assertEqual(len(snapshot), 3)
+        self.assertEqual(self.image.diff(snapshot), [])
+
+    def test_diff_reset(self):
+        buffer = bytearray(0x300)
+        buffer[0x100:0x104] = (0x00000011).to_bytes(4, 'little')
+
+        changes = self.image.diff(self.image.snapshot(buffer, 0x40010000))
+
+        self.assertEqual(len(changes), 1)
+        change = changes[0]
+        self.assertEqual(change.path, 'TIMER1.CR')
+        self.assertEqual(change.address, 0x40010100)
+        self.assertEqual(change.old, 0)
+        self.assertEqual(change.new, 0x11)
+        self.assertEqual(change.fields, {'EN': (0, 1), 'MODE': (0, 1)})
+
+    def test_diff_snapshots(self):
+        old = bytearray(0x300)
+        new = bytearray(0x300)
+        new[0x204:0x206] = (0x0001).to_bytes(2, 'little')
+        new[0x20C] = 0xFF
+
+        changes = self.image.diff(self.image.snapshot(new, 0x40010000), self.image.snapshot(old, 0x40010000))
+
+        self.assertEqual([change.path for change in changes], ['TIMER2.SR'])
+        self.assertEqual(changes[0].fields, {'RUN': (0, 1)})
+
+    def test_without_address_block(self):
+        # Blocks span the registers of each peripheral
+        node = ET.parse("test/example.svd").getroot()
+        peripheral = node.find('peripherals/peripheral')
+        peripheral.remove(peripheral.find('addressBlock'))
+        image = pysvd.element.Device(node).reset_image()
+
+        self.assertEqual([(block.address, block.size) for block in image.blocks],
+                         [(0x40010000, 0x60), (0x40010100, 0x60), (0x40010200, 0x60)])
+        self.assertEqual([len(block.registers) for block in image.blocks], [11, 11, 11])
@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+import pysvd
+
+
+class TestCorpusIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'arm'))
+        shutil.copy('test/example.svd', os.path.join(self.directory, 'example.svd'))
+        shutil.copy('test/example.svd', os.path.join(self.directory, 'arm', 'copy.svd'))
+        shutil.copy('res/cortex-m3.svd', os.path.join(self.directory, 'arm', 'cortex-m3.svd'))
+        self.filename = os.path.join(self.directory, 'index.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_find(self):
+        index = pysvd.index.CorpusIndex()
+        self.assertEqual(len(index.update(self.directory, 1)), 3)
+
+        device = pysvd.element.Device(ET.parse('test/example.svd').getroot())
+        occurrences = index.find(device.find('TIMER0'))
+        self.assertEqual([(item.device, item.name) for item in occurrences],
+                         [('ARM_Example', name) for name in ['TIMER0', 'TIMER1', 'TIMER2']] * 2)
+        self.assertEqual(occurrences[0].filename, os.path.join(self.directory, 'arm', 'copy.svd'))
+
+        occurrences = index.find(device.find('TIMER0').find('CR'))
+        self.assertEqual([item.name for item in occurrences], ['TIMER0.CR', 'TIMER1.CR', 'TIMER2.CR'] * 2)
+        with self.assertRaises(TypeError):
+            index.find(device)
+
+    def test_update(self):
+        index = pysvd.index.CorpusIndex(self.filename)
+        index.update(self.directory, 1)
+        index.save()
+
+        index = pysvd.index.CorpusIndex(self.filename)
+        self.assertEqual(index.update(self.directory, 1), [])
+        self.assertEqual(len(index.peripherals), 5)
+
+        os.remove(os.path.join(self.directory, 'arm', 'copy.svd'))
+        with open(os.path.join(self.directory, 'example.svd'), 'w') as file:
+            file.write('<device/>')
+        self.assertEqual(index.update(self.directory, 1), [os.path.join(self.directory, 'example.svd')])
+        self.assertEqual(list(index.errors()), [os.path.join(self.directory, 'example.svd')])
+        self.assertEqual(len(index.peripherals), 4)
+
+    def test_update_parallel(self):
+        index = pysvd.index.CorpusIndex()
+        index.update(self.directory, 2)
+        self.assertEqual(len(index.files), 3)
+        self.assertEqual(index.errors(), {})
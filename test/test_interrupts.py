@@ -0,0 +1,56 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+import pysvd
+
+
+class TestInterruptIndex(unittest.TestCase):
+
+    def test_example(self):
+        device = pysvd.element.Device(ET.parse('test/example.svd').getroot())
+        interrupts = device.interrupts
+
+        self.assertIs(device.interrupts, interrupts)
+        self.assertEqual([(interrupt.name, interrupt.value) for interrupt in interrupts], [('TIMER0', 0), ('TIMER1', 4), ('TIMER2', 6)])
+        self.assertEqual(len(interrupts), 3)
+        self.assertIsNone(interrupts.count)
+        self.assertEqual(interrupts.gaps, [1, 2, 3, 5])
+        self.assertEqual(interrupts.conflicts, {})
+        self.assertEqual([interrupt.name if interrupt else None for interrupt in interrupts.vectors()],
+                         ['TIMER0', None, None, None, 'TIMER1', None, 'TIMER2'])
+
+    def test_conflicts(self):
+        node = ET.parse('test/example.svd').getroot()
+        ET.SubElement(node.find('cpu'), 'deviceNumInterrupts').text = '6'
+        peripherals = node.findall('peripherals/peripheral')
+        added = ((peripherals[1], 'TIMER0', '0'), (peripherals[2], 'SHARED', '4'), (peripherals[2], 'TIMER0', '2'))
+        for (peripheral, name, value) in added:
+            interrupt = ET.SubElement(peripheral, 'interrupt')
+            ET.SubElement(interrupt, 'name').text = name
+            ET.SubElement(interrupt, 'value').text = value
+        interrupts = pysvd.element.Device(node).interrupts
+
+        self.assertEqual([(interrupt.name, interrupt.value) for interrupt in interrupts],
+                         [('TIMER0', 0), ('TIMER0', 2), ('SHARED', 4), ('TIMER1', 4), ('TIMER2', 6)])
+        self.assertEqual([peripheral.name for peripheral in interrupts.peripherals[('TIMER0', 0)]], ['TIMER0', 'TIMER1'])
+        self.assertEqual([interrupt.name for interrupt in interrupts.conflicts[4]], ['SHARED', 'TIMER1'])
+        self.assertEqual([interrupt.value for interrupt in interrupts.duplicates['TIMER0']], [0, 2])
+        self.assertEqual([(interrupt.name, interrupt.value) for interrupt in interrupts.unique()],
+                         [('TIMER0', 0), ('SHARED', 4), ('TIMER1', 4), ('TIMER2', 6)])
+        self.assertEqual([interrupt.name for interrupt in interrupts.out_of_range], ['TIMER2'])
+        self.assertEqual(interrupts.gaps, [1, 3, 5])
+        self.assertEqual(len(interrupts.vectors()), 7)
+        self.assertEqual(len(interrupts.problems()), 4)
+
+    def test_exceptions(self):
+        node = ET.parse('test/example.svd').getroot()
+        device = pysvd.element.Device(node)
+        self.assertEqual([exception.number for exception in device.interrupts.exceptions], [2, 3, 4, 5, 6, 11, 12, 14, 15])
+
+        node.find('cpu/name').text = 'CM0+'
+        self.assertEqual([exception.handler for exception in pysvd.element.Device(node).interrupts.exceptions],
+                         ['NMI_Handler', 'HardFault_Handler', 'SVC_Handler', 'PendSV_Handler', 'SysTick_Handler'])
+        node.find('cpu/name').text = 'CM33'
+        self.assertIn(7, [exception.number for exception in pysvd.element.Device(node).interrupts.exceptions])
+        node.find('cpu/name').text = 'CA9'
+        self.assertEqual(pysvd.element.Device(node).interrupts.exceptions, ())
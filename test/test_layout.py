@@ -0,0 +1,103 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+import pysvd
+
+
+def peripheral(registers, name='TIMER0'):
+    node = ET.fromstring('<peripheral><name>{}</name><baseAddress>0x40000000</baseAddress>'
+                         '<registers>{}</registers></peripheral>'.format(name, registers))
+    return pysvd.element.Peripheral(None, node)
+
+
+class TestLayout(unittest.TestCase):
+
+    def test_identifier(self):
+        self.assertEqual(pysvd.layout.identifier('CH[%s]'), 'CH')
+        self.assertEqual(pysvd.layout.identifier('VAL%s'), 'VAL')
+        self.assertEqual(pysvd.layout.identifier('A-B.C'), 'ABC')
+
+    def test_reserved(self):
+        layout = pysvd.layout.layout(peripheral(
+            '<register><name>CR</name><addressOffset>0</addressOffset><size>32</size></register>'
+            '<register><name>SR</name><addressOffset>0x8</addressOffset><size>16</size></register>'))
+
+        self.assertEqual(layout.size, 12)
+        self.assertEqual(layout.alignment, 4)
+        self.assertEqual([entry.offset for entry in layout.entries], [0, 4, 8, 10])
+        self.assertIsInstance(layout.entries[1], pysvd.layout.Reserved)
+        self.assertEqual(layout.entries[1].size, 4)
+        self.assertEqual(layout.entries[3], pysvd.layout.Reserved(10, 2))
+
+    def test_array(self):
+        layout = pysvd.layout.layout(peripheral(
+            '<register><dim>4</dim><dimIncrement>4</dimIncrement><name>VAL[%s]</name><addressOffset>0</addressOffset>'
+            '<size>32</size></register>'
+            '<register><dim>2</dim><dimIncrement>8</dimIncrement><dimIndex>0-1</dimIndex><name>CC%s</name>'
+            '<addressOffset>0x10</addressOffset><size>32</size></register>'))
+
+        (values, cc0, reserved, cc1) = layout.entries
+        self.assertEqual((values.name, values.count, values.size), ('VAL', 4, 16))
+        self.assertEqual((cc0.name, cc1.name, cc1.offset), ('CC0', 'CC1', 0x18))
+        self.assertEqual(reserved, pysvd.layout.Reserved(0x14, 4))
+        self.assertEqual(layout.size, 0x1C)
+
+    def test_list_array(self):
+        # Lists without dimIndex like NVIC ISER%s are indexed from 0 and become arrays if contiguous
+        layout = pysvd.layout.layout(peripheral(
+            '<register><dim>8</dim><dimIncrement>4</dimIncrement><name>ISER%s</name><addressOffset>0</addressOffset>'
+            '<size>32</size></register>'
+            '<register><dim>8</dim><dimIncrement>4</dimIncrement><name>ICER%s</name><addressOffset>0x80</addressOffset>'
+            '<size>32</size></register>'
+            '<register><dim>2</dim><dimIncrement>8</dimIncrement><name>CC%s</name><addressOffset>0x100</addressOffset>'
+            '<size>32</size></register>'))
+
+        (iser, reserved, icer, _, cc0, padding, cc1) = layout.entries
+        self.assertEqual((iser.name, iser.offset, iser.count, iser.size), ('ISER', 0, 8, 0x20))
+        self.assertEqual(reserved, pysvd.layout.Reserved(0x20, 0x60))
+        self.assertEqual((icer.name, icer.offset, icer.count), ('ICER', 0x80, 8))
+        self.assertEqual((cc0.name, cc1.name, cc1.offset), ('CC0', 'CC1', 0x108))
+        self.assertEqual(padding, pysvd.layout.Reserved(0x104, 4))
+
+    def test_union(self):
+        layout = pysvd.layout.layout(peripheral(
+            '<register><name>CR</name><addressOffset>0</addressOffset><size>32</size></register>'
+            '<register><name>CR_ALT</name><alternateRegister>CR</alternateRegister><addressOffset>0</addressOffset><size>16</size>'
+            '</register><register><name>CR_HIGH</name><addressOffset>2</addressOffset><size>16</size></register>'))
+
+        (union, ) = layout.entries
+        self.assertIsInstance(union, pysvd.layout.Union)
+        self.assertEqual((union.offset, union.size), (0, 4))
+        self.assertEqual([member.name for member in union.members], ['CR', 'CR_ALT', 'CR_HIGH'])
+
+    def test_cluster(self):
+        layout = pysvd.layout.layout(peripheral(
+            '<cluster><dim>2</dim><dimIncrement>0x10</dimIncrement><name>CH[%s]</name><addressOffset>0x10</addressOffset>'
+            '<register><name>CR</name><addressOffset>0</addressOffset><size>32</size></register>'
+            '<register><name>SR</name><addressOffset>4</addressOffset><size>8</size></register></cluster>'))
+
+        (reserved, channels) = layout.entries
+        self.assertEqual(reserved, pysvd.layout.Reserved(0, 0x10))
+        self.assertEqual((channels.name, channels.count, channels.size), ('CH', 2, 0x20))
+        cluster = pysvd.layout.layout(channels.element)
+        self.assertEqual((cluster.size, cluster.alignment), (0x10, 4))
+        self.assertEqual(cluster.entries[-1], pysvd.layout.Reserved(5, 11))
+        self.assertEqual(layout.size, 0x30)
+
+    def test_cache(self):
+        cache = {}
+        registers = '<register><name>CR</name><addressOffset>0</addressOffset><size>32</size></register>'
+        timer0 = pysvd.layout.layout(peripheral(registers), cache)
+        timer1 = pysvd.layout.layout(peripheral(registers, 'TIMER1'), cache)
+        other = pysvd.layout.layout(peripheral(registers.replace('>0<', '>4<')), cache)
+
+        self.assertIs(timer0, timer1)
+        self.assertIsNot(timer0, other)
+        self.assertEqual(len(cache), 2)
+
+    def test_derived(self):
+        device = pysvd.element.Device(ET.parse('test/example.svd').getroot())
+        cache = {}
+        (timer0, timer1, timer2) = [pysvd.layout.layout(item, cache) for item in device.peripherals]
+        self.assertIs(timer0, timer1)
+        self.assertIs(timer0, timer2)
@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+import pysvd
+
+
+class TestManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'manifest')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_fingerprint(self):
+        device = pysvd.element.Device(ET.parse('test/example.svd').getroot())
+        (timer0, timer1, timer2) = device.peripherals
+        self.assertNotEqual(pysvd.manifest.fingerprint(timer0), pysvd.manifest.fingerprint(timer1))
+        self.assertNotEqual(pysvd.manifest.fingerprint(timer0), pysvd.manifest.fingerprint(timer0, 'split'))
+        self.assertEqual(pysvd.manifest.fingerprint(timer0), pysvd.manifest.fingerprint(timer0))
+
+    def test_manifest(self):
+        output = os.path.join(self.directory, 'output')
+        manifest = pysvd.manifest.Manifest(self.filename)
+        self.assertIsNone(manifest.get('TIMER0', 'a'))
+        manifest.set('TIMER0', 'a', fragment='text')
+        manifest.set('TIMER1', 'b', file=output)
+        manifest.save()
+
+        manifest = pysvd.manifest.Manifest(self.filename)
+        self.assertEqual(manifest.get('TIMER0', 'a'), {'digest': 'a', 'fragment': 'text'})
+        self.assertIsNone(manifest.get('TIMER0', 'b'))
+        # Output file does not exist
+        self.assertIsNone(manifest.get('TIMER1', 'b'))
+        pysvd.output.write(output, 'text')
+        self.assertIsNotNone(manifest.get('TIMER1', 'b'))
+
+        manifest.prune(['TIMER1'])
+        self.assertTrue(manifest.modified)
+        self.assertEqual(list(manifest.entries), ['TIMER1'])
+
+    def test_broken(self):
+        pysvd.output.write(self.filename, '{')
+        self.assertEqual(pysvd.manifest.Manifest(self.filename).entries, {})
+
+    def test_load(self):
+        output = os.path.join(self.directory, 'TIMER1.rst')
+        pysvd.output.write(output, 'text')
+        manifest = pysvd.manifest.Manifest(self.filename)
+        manifest.set('TIMER1', 'b', file=output)
+        self.assertEqual(manifest.fragment('TIMER0', 'a', lambda: 'text'), 'text')
+        manifest.save()
+
+        # Unchanged fragments are not rendered, removed peripherals lose their output file
+        manifest = pysvd.manifest.load(self.filename, ['TIMER0'])
+        self.assertEqual(manifest.fragment('TIMER0', 'a', lambda: 'other'), 'text')
+        self.assertFalse(os.path.exists(output))
+        self.assertEqual(list(manifest.entries), ['TIMER0'])
+
+        manifest = pysvd.manifest.load(self.filename, ['TIMER0'], force=True)
+        self.assertEqual(manifest.fragment('TIMER0', 'a', lambda: 'other'), 'other')
+
+    def test_no_file(self):
+        manifest = pysvd.manifest.load(None, ['TIMER0'])
+        self.assertEqual(manifest.fragment('TIMER0', 'a', lambda: 'text'), 'text')
+        self.assertEqual(manifest.fragment('TIMER0', 'a', lambda: 'other'), 'other')
+        manifest.save()
+        self.assertEqual(os.listdir(self.directory), [])
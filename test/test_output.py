@@ -0,0 +1,68 @@
+import gzip
+import lzma
+import os
+import shutil
+import tempfile
+import unittest
+
+import pysvd
+
+
+class TestOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'output')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_write(self):
+        self.assertTrue(pysvd.output.write(self.filename, 'text'))
+        self.assertFalse(pysvd.output.write(self.filename, 'text'))
+        self.assertTrue(pysvd.output.write(self.filename, 'other'))
+        self.assertTrue(pysvd.output.write(self.filename, b'bytes'))
+        with open(self.filename, 'rb') as file:
+            self.assertEqual(file.read(), b'bytes')
+        self.assertEqual(os.listdir(self.directory), ['output'])
+
+    def test_writer(self):
+        with pysvd.output.Writer(self.filename) as file:
+            file.write('a\n')
+            file.writelines(['b\n', 'c\n'])
+            self.assertFalse(os.path.exists(self.filename))
+        self.assertTrue(file.changed)
+        with open(self.filename, 'r') as file:
+            self.assertEqual(file.read(), 'a\nb\nc\n')
+
+    def test_discard(self):
+        pysvd.output.write(self.filename, 'text')
+        with self.assertRaises(RuntimeError):
+            with pysvd.output.Writer(self.filename) as file:
+                file.write('partial')
+                raise RuntimeError('failed')
+
+        self.assertFalse(file.changed)
+        with open(self.filename, 'r') as file:
+            self.assertEqual(file.read(), 'text')
+        self.assertEqual(os.listdir(self.directory), ['output'])
+
+    def test_compression(self):
+        filename = self.filename + '.gz'
+        self.assertTrue(pysvd.output.write(filename, 'text'))
+        self.assertFalse(pysvd.output.write(filename, 'text'))
+        with gzip.open(filename, 'rt') as file:
+            self.assertEqual(file.read(), 'text')
+
+        filename = self.filename + '.xz'
+        self.assertTrue(pysvd.output.write(filename, 'text'))
+        self.assertFalse(pysvd.output.write(filename, 'text'))
+        with lzma.open(filename, 'rt') as file:
+            self.assertEqual(file.read(), 'text')
+
+        self.assertTrue(pysvd.output.write(self.filename, 'text', 'gzip'))
+        with gzip.open(self.filename, 'rt') as file:
+            self.assertEqual(file.read(), 'text')
+
+        with self.assertRaises(ValueError):
+            pysvd.output.Writer(self.filename, compression='zip')
@@ -57,6 +57,29 @@ class TestParserInteger(unittest.TestCase):
             pysvd.parser.Integer('text')
 
 
+class TestParserDontCare(unittest.TestCase):
+
+    def test_default_none(self):
+        test = pysvd.parser.DontCare(None)
+
+        self.assertIsNone(test)
+
+    def test_no_dont_care(self):
+        self.assertIsNone(pysvd.parser.DontCare('0b1100'))
+        self.assertIsNone(pysvd.parser.DontCare('0x1234'))
+        self.assertIsNone(pysvd.parser.DontCare('4711'))
+
+    def test_binary_0b(self):
+        test = pysvd.parser.DontCare('0b1xx0')
+
+        self.assertEqual(test, (0b1001, 0b1000))
+
+    def test_binary_hash(self):
+        test = pysvd.parser.DontCare('#1x0X')
+
+        self.assertEqual(test, (0b1010, 0b1000))
+
+
 class TestParserBoolean(unittest.TestCase):
 
     def test_default_none(self):
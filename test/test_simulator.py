@@ -0,0 +1,145 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+import pysvd
+
+
+class TestSimulator(unittest.TestCase):
+
+    xml = '''
+    <device schemaVersion="1.3">
+        <name>SIM</name>
+        <version>1.0</version>
+        <addressUnitBits>8</addressUnitBits>
+        <width>32</width>
+        <size>32</size>
+        <access>read-write</access>
+        <resetValue>0</resetValue>
+        <resetMask>0xFFFFFFFF</resetMask>
+        <cpu>
+            <name>CM3</name>
+            <revision>r1p0</revision>
+            <endian>little</endian>
+            <mpuPresent>false</mpuPresent>
+            <fpuPresent>false</fpuPresent>
+            <nvicPrioBits>3</nvicPrioBits>
+            <vendorSystickConfig>false</vendorSystickConfig>
+        </cpu>
+        <peripherals>
+            <peripheral>
+                <name>UART</name>
+                <baseAddress>0x40000000</baseAddress>
+                <registers>
+                    <register>
+                        <name>CR</name>
+                        <addressOffset>0x0</addressOffset>
+                        <resetValue>0x00000100</resetValue>
+                    </register>
+                    <register>
+                        <name>SR</name>
+                        <addressOffset>0x4</addressOffset>
+                        <fields>
+                            <field>
+                                <name>RXNE</name>
+                                <bitOffset>0</bitOffset>
+                                <access>read-only</access>
+                            </field>
+                            <field>
+                                <name>ERR</name>
+                                <bitOffset>1</bitOffset>
+                                <modifiedWriteValues>oneToClear</modifiedWriteValues>
+                            </field>
+                            <field>
+                                <name>TGL</name>
+                                <bitOffset>2</bitOffset>
+                                <modifiedWriteValues>oneToToggle</modifiedWriteValues>
+                            </field>
+                            <field>
+                                <name>EVT</name>
+                                <bitOffset>3</bitOffset>
+                                <access>read-only</access>
+                                <readAction>clear</readAction>
+                            </field>
+                        </fields>
+                    </register>
+                    <register>
+                        <name>DR</name>
+                        <addressOffset>0x8</addressOffset>
+                        <size>16</size>
+                        <access>write-only</access>
+                    </register>
+                    <register>
+                        <name>KEY</name>
+                        <addressOffset>0xC</addressOffset>
+                        <access>read-writeOnce</access>
+                    </register>
+                </registers>
+            </peripheral>
+        </peripherals>
+    </device>'''
+
+    def setUp(self):
+        device = pysvd.element.Device(ET.fromstring(self.xml))
+        self.test = pysvd.simulator.RegisterFile(device)
+
+    def test_reset(self):
+        test = self.test
+        self.assertEqual(len(test.buffer), 14)
+        self.assertEqual(test.read(0x40000000), 0x100)
+
+        test.write(0x40000000, 0x12345678)
+        self.assertEqual(test.read(test.address('UART.CR')), 0x12345678)
+        test.reset()
+        self.assertEqual(test.read(0x40000000), 0x100)
+
+    def test_unmapped(self):
+        with self.assertRaises(KeyError):
+            self.test.read(0x40000002)
+        with self.assertRaises(KeyError):
+            self.test.write(0x40000010, 0)
+
+    def test_read_only(self):
+        test = self.test
+        test.write(0x40000004, 0x1)
+        self.assertEqual(test.read(0x40000004), 0x0)
+
+        test.poke(0x40000004, 0x1)
+        test.write(0x40000004, 0x0)
+        self.assertEqual(test.read(0x40000004), 0x1)
+
+    def test_one_to_clear(self):
+        test = self.test
+        test.poke(0x40000004, 0x2)
+        test.write(0x40000004, 0x0)
+        self.assertEqual(test.read(0x40000004), 0x2)
+        test.write(0x40000004, 0x2)
+        self.assertEqual(test.read(0x40000004), 0x0)
+
+    def test_one_to_toggle(self):
+        test = self.test
+        test.write(0x40000004, 0x4)
+        self.assertEqual(test.read(0x40000004), 0x4)
+        test.write(0x40000004, 0x4)
+        self.assertEqual(test.read(0x40000004), 0x0)
+
+    def test_read_clear(self):
+        test = self.test
+        test.poke(0x40000004, 0x9)
+        self.assertEqual(test.read(0x40000004), 0x9)
+        self.assertEqual(test.read(0x40000004), 0x1)
+
+    def test_write_only(self):
+        test = self.test
+        test.write(0x40000008, 0x1234)
+        self.assertEqual(test.read(0x40000008), 0)
+        self.assertEqual(test.peek(0x40000008), 0x1234)
+
+    def test_write_once(self):
+        test = self.test
+        test.write(0x4000000C, 0xAA)
+        test.write(0x4000000C, 0x55)
+        self.assertEqual(test.read(0x4000000C), 0xAA)
+
+        test.reset()
+        test.write(0x4000000C, 0x55)
+        self.assertEqual(test.read(0x4000000C), 0x55)
@@ -11,6 +11,15 @@ class TestSpecialCluster(unittest.TestCase):
         node = ET.parse("test/specialCluster.xml").getroot()
         cls.peripheral = pysvd.element.Peripheral(None, node)
 
+    def test_digest(self):
+        node = ET.parse("test/specialCluster.xml").getroot()
+        peripheral = pysvd.element.Peripheral(None, node)
+
+        self.assertEqual(peripheral, self.peripheral)
+        self.assertEqual(peripheral.clusters[0], self.peripheral.clusters[0])
+        self.assertNotEqual(peripheral.clusters[0], self.peripheral.clusters[1])
+        self.assertFalse(peripheral.clusters[0].equal_struct(self.peripheral.clusters[1]))
+
     def test_general(self):
         peripheral = self.peripheral
 
@@ -0,0 +1,82 @@
+import argparse
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+import pysvd
+from scripts import svd2register
+
+
+def render(filename):
+    directory = tempfile.mkdtemp()
+    try:
+        target = os.path.join(directory, 'device.h')
+        svd2register.convert(filename, target, argparse.Namespace(manifest=None, force=False))
+        with open(target, 'r') as file:
+            return file.read()
+    finally:
+        shutil.rmtree(directory)
+
+
+class TestSvd2Register(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.header = render('test/example.svd')
+
+    def test_interrupts(self):
+        self.assertIn('    SysTick_IRQn                  = -1,\n', self.header)
+        self.assertIn('    TIMER1_IRQn                   = 4,\n', self.header)
+
+    def test_struct(self):
+        struct = self.header[self.header.index('typedef struct'):self.header.index('} TIMER0_Type;')]
+        lines = [line.split(';')[0].strip() for line in struct.splitlines()[2:]]
+
+        self.assertEqual(lines, [
+            '__IO uint32_t CR', '__IO uint16_t SR', '__I  uint16_t RESERVED0[5]', '__IO uint16_t INT', '__I  uint16_t RESERVED1[7]',
+            '__IO uint32_t COUNT', '__IO uint32_t MATCH', 'union', '{', '__I  uint32_t PRESCALE_RD', '__O  uint32_t PRESCALE_WR', '}',
+            '__I  uint32_t RESERVED2[9]', '__IO uint32_t RELOAD[4]'])
+        self.assertIn('INT; /*!< Offset: 0x010 ', struct)
+        self.assertIn('RELOAD[4]; /*!< Offset: 0x050 ', struct)
+        self.assertIn('static_assert(sizeof(TIMER0_Type) == 0x60, "Size of TIMER0_Type mismatch");', self.header)
+
+    def test_macros(self):
+        self.assertIn('#define TIMER0_CR_CNT_Pos 2\n#define TIMER0_CR_CNT_Msk (0x3UL << TIMER0_CR_CNT_Pos)\n', self.header)
+        self.assertIn('#define TIMER0_CR_S_Pos 31\n#define TIMER0_CR_S_Msk (0x1UL << TIMER0_CR_S_Pos)\n', self.header)
+        self.assertIn('#define TIMER0_INT_MODE_Pos 4\n#define TIMER0_INT_MODE_Msk (0x7UL << TIMER0_INT_MODE_Pos)\n', self.header)
+
+    def test_instances(self):
+        # Derived peripherals share the struct type
+        self.assertEqual(self.header.count('typedef struct'), 1)
+        self.assertIn('#define TIMER2_BASE 0x40010200UL\n', self.header)
+        self.assertIn('#define TIMER2 ((TIMER0_Type *) TIMER2_BASE)\n', self.header)
+
+    def test_cluster(self):
+        peripheral = pysvd.element.Peripheral(None, ET.parse('test/specialCluster.xml').getroot())
+        output = io.StringIO()
+        svd2register.write_struct(output, 'RTC', peripheral, 'RTC_Type', {})
+        text = output.getvalue()
+
+        # Nested cluster structs are written before the peripheral struct, overlapping clusters form a union
+        self.assertLess(text.index('} RtcMode1;'), text.index('} RTC_Type;'))
+        self.assertIn('    __IO uint16_t COMP[2]; /*!< Offset: 0x018 MODE1 Compare n Value */\n', text)
+        self.assertIn('    __I  uint8_t RESERVED1[5];\n', text)
+        self.assertIn('static_assert(sizeof(RtcMode1) == 0x1C, "Size of RtcMode1 mismatch");', text)
+        self.assertIn('    union\n    {\n        RtcMode2 MODE2; /*!< Offset: 0x000 ', text)
+        self.assertIn('        RtcMode0 MODE0; /*!< Offset: 0x000 ', text)
+        self.assertIn('static_assert(sizeof(RTC_Type) == 0x20, "Size of RTC_Type mismatch");', text)
+
+    def test_dim_list(self):
+        # NVIC registers ISER%s without dimIndex are arrays
+        header = render('res/cortex-m3.svd')
+        struct = header[header.index('/* NVIC '):header.index('} NVIC_Type;')]
+
+        self.assertIn('    __IO uint32_t ISER[16]; /*!< Offset: 0x000 ', struct)
+        self.assertIn('    __I  uint32_t RESERVED0[16];\n    __IO uint32_t ICER[16]; /*!< Offset: 0x080 ', struct)
+        self.assertIn('    __I  uint32_t IABR[16]; /*!< Offset: 0x200 ', struct)
+        self.assertIn('    __IO uint32_t IPR[124]; /*!< Offset: 0x300 ', struct)
+        self.assertIn('    __IO uint32_t STIR; /*!< Offset: 0xE00 ', struct)
+        self.assertNotIn('ISER16', header)
@@ -0,0 +1,41 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+import pysvd
+from scripts import svd2rst
+
+
+class TestSvd2RstSplit(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        shutil.copy('test/example.svd', os.path.join(self.directory, 'a.svd'))
+        node = ET.parse('test/example.svd')
+        node.getroot().find('peripherals/peripheral/baseAddress').text = '0x50020000'
+        node.write(os.path.join(self.directory, 'b.svd'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read(self, *path):
+        with open(os.path.join(self.directory, 'doc', *path), 'r') as file:
+            return file.read()
+
+    def test_batch(self):
+        # Each device of a batch writes its pages into its own directory
+        args = argparse.Namespace(split=True, jobs=1, manifest=os.path.join(self.directory, 'doc', '{name}.json'), force=False,
+                                  templates=None)
+        results = pysvd.batch.run(svd2rst.convert, pysvd.batch.inputs([self.directory]), os.path.join(self.directory, 'doc', '{name}.rst'),
+                                  (args, ), 1)
+        self.assertEqual([result.error for result in results], [None, None])
+
+        for (name, address) in (('a', '0x40010000'), ('b', '0x50020000')):
+            self.assertIn('   {}/TIMER0\n'.format(name), self.read(name + '.rst'))
+            self.assertIn(':Address: {}\n'.format(address), self.read(name, 'TIMER0.rst'))
+            manifest = json.loads(self.read(name + '.json'))
+            self.assertEqual(manifest['TIMER0']['file'], os.path.join(self.directory, 'doc', name, 'TIMER0.rst'))
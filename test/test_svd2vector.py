@@ -0,0 +1,71 @@
+import argparse
+import os
+import re
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from scripts import svd2vector
+
+
+class TestSvd2Vector(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def render(self, cpu=None):
+        filename = 'test/example.svd'
+        if cpu is not None:
+            node = ET.parse(filename)
+            node.getroot().find('cpu/name').text = cpu
+            filename = os.path.join(self.directory, 'device.svd')
+            node.write(filename)
+        target = os.path.join(self.directory, 'vectors.c')
+        svd2vector.convert(filename, target, argparse.Namespace())
+        with open(target, 'r') as file:
+            return file.read()
+
+    def vectors(self, text):
+        table = text[text.index('__attribute__((section(".vectors"), used)) =\n'):text.index('};')]
+        return [tuple(match) for match in re.findall(r'^    (.+?),\s+/\*\s+(\d+) ', table, re.MULTILINE)]
+
+    def test_vectors(self):
+        text = self.render()
+        vectors = self.vectors(text)
+
+        self.assertIn('const VECTOR_TABLE_Type __Vectors[23]', text)
+        self.assertEqual(len(vectors), 23)
+        self.assertEqual([int(number) for (handler, number) in vectors], list(range(23)))
+        self.assertEqual([handler for (handler, number) in vectors], [
+            '(VECTOR_TABLE_Type) &__StackTop', 'Reset_Handler', 'NMI_Handler', 'HardFault_Handler', 'MemManage_Handler', 'BusFault_Handler',
+            'UsageFault_Handler', '0', '0', '0', '0', 'SVC_Handler', 'DebugMon_Handler', '0', 'PendSV_Handler', 'SysTick_Handler',
+            'TIMER0_IRQHandler', '0', '0', '0', 'TIMER1_IRQHandler', '0', 'TIMER2_IRQHandler'])
+
+    def test_handlers(self):
+        text = self.render()
+        aliases = re.findall(r'^void (\w+)\(void\) __attribute__\(\(weak, alias\("Default_Handler"\)\)\);$', text, re.MULTILINE)
+
+        self.assertEqual(aliases, ['NMI_Handler', 'HardFault_Handler', 'MemManage_Handler', 'BusFault_Handler', 'UsageFault_Handler',
+                                   'SVC_Handler', 'DebugMon_Handler', 'PendSV_Handler', 'SysTick_Handler', 'TIMER0_IRQHandler',
+                                   'TIMER1_IRQHandler', 'TIMER2_IRQHandler'])
+        self.assertIn('void Reset_Handler(void)\n{', text)
+        self.assertIn('void Default_Handler(void)\n{', text)
+        self.assertIn('#define __NVIC_PRIO_BITS 3 ', text)
+        self.assertIn('#define __VTOR_PRESENT 1 ', text)
+
+    def test_baseline(self):
+        vectors = self.vectors(self.render('CM0+'))
+        self.assertEqual([vectors[number][0] for number in (2, 3, 11, 14, 15)],
+                         ['NMI_Handler', 'HardFault_Handler', 'SVC_Handler', 'PendSV_Handler', 'SysTick_Handler'])
+        self.assertEqual([number for (number, (handler, _)) in enumerate(vectors[:16]) if handler == '0'], [4, 5, 6, 7, 8, 9, 10, 12, 13])
+
+        vectors = self.vectors(self.render('CM33'))
+        self.assertEqual(vectors[7][0], 'SecureFault_Handler')
+
+    def test_no_cortex_m(self):
+        with self.assertRaises(ValueError):
+            self.render('CA9')
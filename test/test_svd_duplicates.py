@@ -0,0 +1,105 @@
+import argparse
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+import pysvd
+from scripts import svd_duplicates
+
+fields = '<fields><field><name>EN</name><bitOffset>0</bitOffset><bitWidth>1</bitWidth></field></fields>'
+
+registers = (
+    '<register><name>CTRL</name><description>Control</description><addressOffset>0x00</addressOffset>{fields}</register>'
+    '<register><name>MODE</name><description>Mode</description><addressOffset>0x04</addressOffset>{fields}</register>'
+    '{channels}'
+    '<register><name>B0</name><description>Buffer B0</description><addressOffset>0x40</addressOffset></register>'
+    '<register><name>B1</name><description>Buffer B1</description><addressOffset>0x44</addressOffset></register>'
+    '<register><name>B2</name><description>Buffer B2</description><addressOffset>0x48</addressOffset></register>'
+    '<register derivedFrom="B1"><name>ALIAS</name><description>Alias</description><addressOffset>0x50</addressOffset></register>'
+).format(fields=fields, channels=''.join(
+    '<register><name>CH{0}</name><description>Channel CH{0}</description><addressOffset>0x{1:02X}</addressOffset></register>'.format(
+        index, 0x10 + 8 * index) for index in range(4)))
+
+device = (
+    '<device schemaVersion="1.3"><name>DEVICE</name><version>1.0</version><description>Device</description>'
+    '<addressUnitBits>8</addressUnitBits><width>32</width><size>32</size><access>read-write</access><resetValue>0</resetValue>'
+    '<resetMask>0xFFFFFFFF</resetMask>'
+    '<peripherals>'
+    '<peripheral><name>UART0</name><description>UART</description><groupName>UART</groupName><baseAddress>0x40000000</baseAddress>'
+    '<registers>{0}</registers></peripheral>'
+    '<peripheral><name>UART1</name><description>UART</description><groupName>UART</groupName><baseAddress>0x40001000</baseAddress>'
+    '<registers>{0}</registers></peripheral>'
+    '</peripherals></device>').format(registers)
+
+
+class TestRewrite(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.svd = os.path.join(self.directory, 'device.svd')
+        with open(self.svd, 'w') as file:
+            file.write(device)
+        self.output = os.path.join(self.directory, 'rewritten.svd')
+
+        args = argparse.Namespace(svd=self.svd, output=self.output, sort=False, rewrite=True, jobs=1)
+        svd_duplicates.analyze(svd_duplicates.TextOutput(io.StringIO()), args, svd_duplicates.Level.all,
+                               svd_duplicates.Depth.enumeratedValues)
+        self.node = ET.parse(self.output).getroot()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_digest(self):
+        original = pysvd.element.Device(ET.fromstring(device))
+        rewritten = pysvd.element.Device(self.node)
+
+        self.assertEqual([(peripheral.name, peripheral.digest()) for peripheral in rewritten.peripherals],
+                         [(peripheral.name, peripheral.digest()) for peripheral in original.peripherals])
+        self.assertEqual([register.name for register in rewritten.peripherals[1].registers],
+                         [register.name for register in original.peripherals[1].registers])
+
+    def test_derive(self):
+        (uart0, uart1) = self.node.findall('peripherals/peripheral')
+        self.assertEqual(uart1.get('derivedFrom'), 'UART0')
+        self.assertIsNone(uart1.find('registers'))
+
+        mode = [register for register in uart0.iter('register') if register.findtext('name') == 'MODE'][0]
+        self.assertEqual(mode.get('derivedFrom'), 'CTRL')
+        self.assertIsNone(mode.find('fields'))
+
+    def test_collapse(self):
+        registers = {register.findtext('name'): register for register in self.node.find('peripherals/peripheral').iter('register')}
+        channels = registers['CH%s']
+
+        self.assertEqual(channels.findtext('dim'), '4')
+        self.assertEqual(int(channels.findtext('dimIncrement'), 0), 8)
+        self.assertEqual(channels.findtext('dimIndex'), '0-3')
+        self.assertEqual(channels.findtext('description'), 'Channel CH%s')
+        self.assertEqual(channels.findtext('addressOffset'), '0x10')
+        self.assertFalse({'CH0', 'CH1', 'CH2', 'CH3'} & set(registers))
+
+    def test_referenced(self):
+        # B1 is referenced by ALIAS and splits the run B0..B2
+        registers = [register.findtext('name') for register in self.node.find('peripherals/peripheral').iter('register')]
+        self.assertIn('B1', registers)
+        self.assertIn('B0', registers)
+        self.assertIn('B2', registers)
+        self.assertNotIn('B%s', registers)
+
+
+class TestAnalyze(unittest.TestCase):
+
+    def analyze(self, jobs):
+        file = io.StringIO()
+        args = argparse.Namespace(svd='test/example.svd', output=None, sort=False, rewrite=False, jobs=jobs)
+        svd_duplicates.analyze(svd_duplicates.JsonLinesOutput(file), args, svd_duplicates.Level.all, svd_duplicates.Depth.registers)
+        return file.getvalue()
+
+    def test_jobs(self):
+        # Serial by default, the process pool gives the same findings
+        serial = self.analyze(None)
+        self.assertIn('"kind": "Register"', serial)
+        self.assertEqual(self.analyze(2), serial)
@@ -0,0 +1,57 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pysvd
+
+
+class TestTemplate(unittest.TestCase):
+
+    def test_render(self):
+        template = pysvd.template.Template("#define {name}_Msk (0x{mask:0{digits}X}UL) /* '{{{name!r}}}' */\n", ('name', 'mask', 'digits'))
+        self.assertEqual(template('EN', 0x1F, 4), "#define EN_Msk (0x001FUL) /* '{'EN'}' */\n")
+        self.assertEqual(template.join([('A', 1, 1), ('B', 2, 2)]),
+                         "#define A_Msk (0x1UL) /* '{'A'}' */\n#define B_Msk (0x02UL) /* '{'B'}' */\n")
+
+    def test_positional(self):
+        template = pysvd.template.Template('{} {} {0}', ('a', 'b'))
+        self.assertEqual(template(1, 2), '1 2 1')
+
+    def test_unknown_field(self):
+        with self.assertRaises(KeyError):
+            pysvd.template.Template('{other}', ('name', ))
+        with self.assertRaises(IndexError):
+            pysvd.template.Template('{1}', ('name', ))
+
+    def test_escape(self):
+        text = 'a\\b\t"c\' é {{}}'
+        self.assertEqual(pysvd.template.Template(text, ())(), text.format())
+
+
+class TestTemplates(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.templates = pysvd.template.Templates({'item': (':{name}: {value}\n', ('name', 'value'))})
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_load(self):
+        digest = self.templates.digest()
+        with open(os.path.join(self.directory, 'item.tmpl'), 'w') as file:
+            file.write('{name} = {value}\n')
+        with open(os.path.join(self.directory, 'README'), 'w') as file:
+            file.write('ignored')
+
+        self.templates.load(self.directory)
+        self.assertEqual(self.templates['item']('Name', 'TIMER0'), 'Name = TIMER0\n')
+        self.assertNotEqual(self.templates.digest(), digest)
+
+    def test_load_unknown(self):
+        with open(os.path.join(self.directory, 'other.tmpl'), 'w') as file:
+            file.write('{name}')
+
+        with self.assertRaises(KeyError):
+            self.templates.load(self.directory)
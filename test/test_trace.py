@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+import numpy
+
+import pysvd
+import pysvd.trace
+
+
+class TestTrace(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        node = ET.parse("test/example.svd").getroot()
+        cls.device = pysvd.element.Device(node)
+
+    def setUp(self):
+        lines = [
+            "1,0x40010000,0x1,w",
+            "2,0x40010000,0x1,w",
+            "3,0x40010002,0x5,w",
+            "4,0x40010100,0x10,r",
+            "5,0x40010100,0x11,w",
+            "6,0x40010000,0x0,w",
+            "7,0x40010020,0x1234,w",
+        ]
+        (handle, self.filename) = tempfile.mkstemp()
+        with os.fdopen(handle, 'w') as file:
+            file.write('\n'.join(lines) + '\n')
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_resolve(self):
+        index = pysvd.trace.AddressIndex.get(self.device)
+        addresses = numpy.array([0x40010000, 0x40010002, 0x40010004, 0x3FFFFFFF], dtype=numpy.uint64)
+
+        self.assertEqual(index.resolve(addresses).tolist()[1:], [-1, 1, -1])
+        self.assertIs(index, pysvd.trace.AddressIndex.get(self.device))
+
+    def test_events(self):
+        replay = pysvd.trace.Replay(self.device)
+        events = list(replay.events(pysvd.trace.read_csv(self.filename, chunk_size=3)))
+
+        self.assertEqual([str(event) for event in events], [
+            'TIMER0.CR.EN: 0 -> 1',
+            'TIMER1.CR.EN: 0 -> 1',
+            'TIMER0.CR.EN: 1 -> 0',
+            'TIMER0.COUNT: 0 -> 4660',
+        ])
+        self.assertEqual(events[0].timestamp, 1)
+        self.assertEqual(replay.unresolved, 1)
+
+    def test_processes(self):
+        replay = pysvd.trace.Replay(self.device)
+        events = list(replay.events(pysvd.trace.read_csv(self.filename, chunk_size=2, processes=2)))
+
+        self.assertEqual(len(events), 4)
+
+    def test_binary(self):
+        chunk = pysvd.trace.parse_lines(open(self.filename).readlines())
+        chunk.tofile(self.filename)
+
+        replay = pysvd.trace.Replay(self.device)
+        events = list(replay.events(pysvd.trace.read_binary(self.filename, chunk_size=4)))
+
+        self.assertEqual(len(events), 4)
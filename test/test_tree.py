@@ -809,3 +809,32 @@ class TestTreeComplete(unittest.TestCase):
                 register_index += 1
 
             peripheral_index += 1
+
+    def test_hash(self):
+        (timer0, timer1, timer2) = self.device.peripherals
+
+        self.assertTrue(timer0.equal_struct(timer1))
+        self.assertEqual(timer0.hash_struct(), timer1.hash_struct())
+        self.assertNotEqual(timer0, timer1)
+
+        for (lhs, rhs) in zip(timer0.registers, timer2.registers):
+            self.assertEqual(lhs, rhs)
+            self.assertEqual(hash(lhs), hash(rhs))
+            self.assertEqual(lhs.hash_struct(), rhs.hash_struct())
+
+        (count, match) = timer0.registers[3:5]
+        self.assertTrue(count.equal_struct(match))
+        self.assertEqual(count.hash_struct(), match.hash_struct())
+        self.assertEqual(len({count, match, timer1.registers[3]}), 2)
+
+    def test_digest(self):
+        (timer0, timer1, timer2) = self.device.peripherals
+
+        self.assertEqual(timer0.digest_struct(), timer1.digest_struct())
+        self.assertNotEqual(timer0.digest(), timer1.digest())
+        self.assertEqual(len(timer0.digest()), 32)
+
+        (count, match) = timer0.registers[3:5]
+        self.assertEqual(count.digest_struct(), match.digest_struct())
+        self.assertNotEqual(count.digest(), match.digest())
+        self.assertEqual(count.digest(), timer2.registers[3].digest())